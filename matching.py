@@ -0,0 +1,272 @@
+"""
+Entity matching for linking external (HRIS, LinkedIn) records to CRM nodes
+"""
+import pandas as pd
+import streamlit as st
+
+from utils import get_node_snapshot, upsert_edges
+
+
+# Columns expected in an external record file (case-insensitive)
+EXTERNAL_RECORD_COLUMNS = [
+    "EMAIL", "FIRST_NAME", "LAST_NAME", "COMPANY_NAME", "COMPANY_DOMAIN",
+    "JOB_TITLE", "DEPARTMENT", "START_DATE", "END_DATE",
+]
+
+# Blocking keys shared by more nodes than this are too common to be useful
+MAX_BLOCK_SIZE = 500
+
+# END_DATE values that mean the employment is ongoing
+CURRENT_END_DATE_VALUES = {"present", "current", "now", "ongoing"}
+
+COMPANY_NAME_STOPWORDS = {"inc", "llc", "ltd", "corp", "corporation", "co", "company", "the", "gmbh", "plc", "group"}
+
+
+def _normalize_text(series):
+    """Lowercase, strip accents and replace punctuation with spaces."""
+    return (
+        series.fillna("").astype(str)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _name_tokens(series, stopwords=()):
+    """Split normalized text into a list of tokens per row."""
+    tokens = _normalize_text(series).str.split()
+    if stopwords:
+        tokens = tokens.map(lambda row: [token for token in row if token not in stopwords])
+    return tokens
+
+
+def _normalize_email(series):
+    """Lowercase and trim email addresses."""
+    return series.fillna("").astype(str).str.strip().str.lower()
+
+
+def _normalize_domain(series):
+    """Reduce URLs and domains to a bare lowercase host name."""
+    return (
+        series.fillna("").astype(str).str.strip().str.lower()
+        .str.replace(r"^(https?://)?(www\.)?", "", regex=True)
+        .str.split("/").str[0]
+    )
+
+
+def _block_keys(ids, keys):
+    """Explode per-row key lists into a (ID, KEY) frame without empty keys."""
+    frame = pd.DataFrame({"ID": ids.values, "KEY": keys.values}).explode("KEY")
+    return frame[frame["KEY"].notna() & (frame["KEY"] != "")].drop_duplicates()
+
+
+def _drop_common_keys(node_keys):
+    """Drop blocking keys shared by more than MAX_BLOCK_SIZE nodes."""
+    block_sizes = node_keys.groupby("KEY")["ID"].transform("size")
+    return node_keys[block_sizes <= MAX_BLOCK_SIZE]
+
+
+def _candidate_pairs(record_keys, node_keys):
+    """Join records to nodes sharing at least one blocking key."""
+    pairs = record_keys.merge(node_keys, on="KEY", suffixes=("_RECORD", "_NODE"))
+    return pairs[["ID_RECORD", "ID_NODE"]].drop_duplicates().reset_index(drop=True)
+
+
+def _token_jaccard(pairs, record_tokens, node_tokens):
+    """Jaccard similarity of token sets for each candidate pair, computed with joins."""
+    pairs = pairs.reset_index(drop=True)
+    left = pd.DataFrame({"PAIR": pairs.index, "TOKENS": record_tokens.loc[pairs["ID_RECORD"]].values})
+    right = pd.DataFrame({"PAIR": pairs.index, "TOKENS": node_tokens.loc[pairs["ID_NODE"]].values})
+
+    left_sizes = left["TOKENS"].str.len().fillna(0)
+    right_sizes = right["TOKENS"].str.len().fillna(0)
+    shared = (
+        left.explode("TOKENS").dropna().drop_duplicates()
+        .merge(right.explode("TOKENS").dropna().drop_duplicates(), on=["PAIR", "TOKENS"])
+        .groupby("PAIR").size()
+        .reindex(pairs.index, fill_value=0)
+    )
+    union = left_sizes + right_sizes - shared
+    return (shared / union.where(union > 0)).fillna(0.0)
+
+
+def _best_match(pairs, scores, prefix):
+    """Keep the highest scoring node per record."""
+    scored = pairs.assign(SCORE=scores.values)
+    best = scored.sort_values("SCORE", ascending=False).drop_duplicates("ID_RECORD")
+    return best.set_index("ID_RECORD").rename(columns={"ID_NODE": f"{prefix}_ID", "SCORE": f"{prefix}_CONFIDENCE"})
+
+
+def _contact_features(emails, first_names, last_names):
+    """Normalized email, email domain, name tokens and blocking keys for people."""
+    email = _normalize_email(emails)
+    domain = email.str.split("@").str[-1].where(email.str.contains("@"), "")
+    tokens = _name_tokens(first_names.fillna("") + " " + last_names.fillna(""))
+
+    exact = ("e:" + email).where(email != "", "")
+    by_domain = [
+        [f"d:{row_domain}:{token}" for token in row_tokens] if row_domain else []
+        for row_domain, row_tokens in zip(domain, tokens)
+    ]
+    by_name = tokens.map(lambda row: "n:" + " ".join(sorted(row)) if len(row) > 1 else "")
+    keys = pd.Series([[e, n, *d] for e, n, d in zip(exact, by_name, by_domain)], index=email.index)
+    return {"email": email, "domain": domain, "tokens": tokens, "keys": _block_keys(email.index.to_series(), keys)}
+
+
+def _company_features(domains, names):
+    """Normalized domain, name tokens and blocking keys for companies."""
+    domain = _normalize_domain(domains)
+    tokens = _name_tokens(names, COMPANY_NAME_STOPWORDS)
+    keys = pd.Series(
+        [[f"d:{row_domain}" if row_domain else "", *[f"n:{token}" for token in row_tokens]]
+         for row_domain, row_tokens in zip(domain, tokens)],
+        index=domain.index,
+    )
+    return {"domain": domain, "tokens": tokens, "keys": _block_keys(domain.index.to_series(), keys)}
+
+
+@st.cache_resource(max_entries=4)
+def _node_features(_snapshot, node_type, version):
+    """Normalized fields and blocking keys for every node in a snapshot.
+
+    Built once per snapshot version and shared read-only across imports, so
+    matching only does per-record work until the snapshot is refreshed.
+    """
+    nodes = _snapshot.table.to_pandas()
+    if node_type == "CONTACT":
+        features = _contact_features(
+            nodes["EMAIL"], nodes["PROPERTIES_FIRSTNAME_VALUE"], nodes["PROPERTIES_LASTNAME_VALUE"]
+        )
+    else:
+        features = _company_features(nodes["DOMAIN"], nodes["NAME"])
+    features["keys"] = _drop_common_keys(features["keys"])
+    features["ids"] = nodes["ID"]
+    return features
+
+
+def _match_contacts(records, contacts):
+    """Match records to contacts by exact email, or email domain plus name tokens."""
+    record = _contact_features(records["EMAIL"], records["FIRST_NAME"], records["LAST_NAME"])
+    pairs = _candidate_pairs(record["keys"], contacts["keys"])
+    if len(pairs) == 0:
+        return pd.DataFrame(columns=["CONTACT_ID", "CONTACT_CONFIDENCE"])
+
+    record_email = record["email"].loc[pairs["ID_RECORD"]].values
+    record_domain = record["domain"].loc[pairs["ID_RECORD"]].values
+    email_exact = (record_email == contacts["email"].loc[pairs["ID_NODE"]].values) & (record_email != "")
+    domain_match = (record_domain == contacts["domain"].loc[pairs["ID_NODE"]].values) & (record_domain != "")
+    name_similarity = _token_jaccard(pairs, record["tokens"], contacts["tokens"])
+
+    scores = (0.7 * name_similarity + 0.3 * domain_match).where(~email_exact, 1.0)
+    best = _best_match(pairs, scores, "CONTACT")
+    best["CONTACT_ID"] = contacts["ids"].loc[best["CONTACT_ID"]].values
+    return best
+
+
+def _match_companies(records, companies):
+    """Match records to companies by exact domain, or shared name tokens."""
+    record = _company_features(records["COMPANY_DOMAIN"], records["COMPANY_NAME"])
+    pairs = _candidate_pairs(record["keys"], companies["keys"])
+    if len(pairs) == 0:
+        return pd.DataFrame(columns=["COMPANY_ID", "COMPANY_CONFIDENCE"])
+
+    record_domain = record["domain"].loc[pairs["ID_RECORD"]].values
+    domain_exact = (record_domain == companies["domain"].loc[pairs["ID_NODE"]].values) & (record_domain != "")
+    name_similarity = _token_jaccard(pairs, record["tokens"], companies["tokens"])
+
+    scores = (0.9 * name_similarity).where(~domain_exact, 1.0)
+    best = _best_match(pairs, scores, "COMPANY")
+    best["COMPANY_ID"] = companies["ids"].loc[best["COMPANY_ID"]].values
+    return best
+
+
+def _parse_dates(series, current_values=()):
+    """Parse a date column, returning dates (None when blank) and a mask of unparseable values."""
+    text = series.astype("string").str.strip()
+    blank = (text.isna() | (text == "") | text.str.lower().isin(current_values)).fillna(True)
+    parsed = pd.to_datetime(text.where(~blank), errors="coerce", format="mixed")
+    invalid = parsed.isna() & ~blank
+    dates = pd.Series([value.date() if pd.notna(value) else None for value in parsed], index=series.index, dtype=object)
+    return dates, invalid
+
+
+def prepare_external_records(df):
+    """Uppercase column names, add any missing expected columns and parse dates.
+
+    START_DATE and END_DATE become dates or None; an END_DATE such as
+    "Present" means the employment is current. Rows with dates that cannot
+    be parsed are kept but flagged in REJECT_REASON so they are not imported.
+    """
+    df = df.rename(columns=lambda column: str(column).strip().upper()).reset_index(drop=True)
+    for column in EXTERNAL_RECORD_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+
+    df["REJECT_REASON"] = None
+    for column, current_values in [("START_DATE", ()), ("END_DATE", CURRENT_END_DATE_VALUES)]:
+        original = df[column]
+        df[column], invalid = _parse_dates(original, current_values)
+        df.loc[invalid & df["REJECT_REASON"].isna(), "REJECT_REASON"] = (
+            f"Invalid {column}: " + original[invalid].astype(str)
+        )
+    return df
+
+
+def match_external_records(records):
+    """Resolve external employment records to contact and company node IDs in one pass.
+
+    Candidates are generated with blocking keys (exact email, email domain
+    plus name token, full name, company domain, company name token) against
+    the node snapshots, then scored with vectorized similarity. Node-side
+    keys are cached per snapshot version, so only the records are processed
+    on each call. Returns the
+    records with CONTACT_ID, COMPANY_ID, per-side confidences and an overall
+    CONFIDENCE_SCORE, or None when the node snapshots have not been built.
+    """
+    contact_snapshot = get_node_snapshot("CONTACT")
+    company_snapshot = get_node_snapshot("COMPANY")
+    if contact_snapshot is None or company_snapshot is None:
+        return None
+
+    records = prepare_external_records(records)
+    contacts = _node_features(contact_snapshot, "CONTACT", contact_snapshot.version)
+    companies = _node_features(company_snapshot, "COMPANY", company_snapshot.version)
+
+    matched = records.join(_match_contacts(records, contacts)).join(_match_companies(records, companies))
+    matched["CONTACT_CONFIDENCE"] = matched["CONTACT_CONFIDENCE"].astype(float).fillna(0.0)
+    matched["COMPANY_CONFIDENCE"] = matched["COMPANY_CONFIDENCE"].astype(float).fillna(0.0)
+    matched["CONFIDENCE_SCORE"] = matched[["CONTACT_CONFIDENCE", "COMPANY_CONFIDENCE"]].min(axis=1).round(3)
+    return matched
+
+
+def accepted_matches(matched, min_confidence=0.8):
+    """Return matched records that are valid and at or above min_confidence."""
+    return matched[
+        matched["REJECT_REASON"].isna()
+        & matched["CONTACT_ID"].notna()
+        & matched["COMPANY_ID"].notna()
+        & (matched["CONFIDENCE_SCORE"] >= min_confidence)
+    ]
+
+
+def import_matched_worked_for(matched, source_system, min_confidence=0.8):
+    """Upsert WORKED_FOR edges for matched records at or above min_confidence."""
+    accepted = accepted_matches(matched, min_confidence)
+    rows = [
+        {
+            "FROM_NODE_ID": row["CONTACT_ID"],
+            "TO_NODE_ID": row["COMPANY_ID"],
+            "START_DATE": row["START_DATE"],
+            "END_DATE": row["END_DATE"],
+            "JOB_TITLE": row["JOB_TITLE"] if pd.notna(row["JOB_TITLE"]) else None,
+            "DEPARTMENT": row["DEPARTMENT"] if pd.notna(row["DEPARTMENT"]) else None,
+            "CONFIDENCE_SCORE": float(row["CONFIDENCE_SCORE"]),
+            "SOURCE_SYSTEM": source_system,
+        }
+        for _, row in accepted.iterrows()
+    ]
+    if not rows:
+        return {"inserted": 0, "updated": 0}
+    return upsert_edges("WORKED_FOR", rows)
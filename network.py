@@ -0,0 +1,394 @@
+"""
+Ego-network extraction, level-of-detail aggregation and layout for the Network page
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import EDGE_TABLES, _sql_literal, execute_snowflake_statement, get_node_label, register_edge_cache
+
+
+# Companies with more employees than this in view are collapsed into a cluster node
+DEFAULT_CLUSTER_THRESHOLD = 25
+
+# Upper bound on edges fetched per hop so one huge company cannot stall the app
+MAX_EDGES_PER_HOP = 50000
+
+# Node IDs per IN list; Snowflake rejects expression lists over 16,384 items
+NEIGHBOR_ID_BATCH_SIZE = 1000
+
+# Hard cap on nodes laid out and drawn after clustering; the farthest nodes are dropped first
+MAX_NETWORK_NODES = 1500
+
+LAYOUT_ITERATIONS = 60
+
+# Above this many nodes, repulsion is approximated with a grid of cell centroids
+EXACT_REPULSION_NODES = 400
+LAYOUT_GRID_SIZE = 24
+
+
+def node_key(node_type, node_id):
+    """Return the graph key for a node."""
+    return f"{node_type}:{node_id}"
+
+
+def _split_node_key(key):
+    """Split a graph key into its node type and node ID."""
+    node_type, node_id = key.split(":", 1)
+    return node_type, node_id
+
+
+def _as_of_filter(as_of):
+    """SQL predicate selecting edges active on a date, or all edges when as_of is None."""
+    if as_of is None:
+        return "TRUE"
+    as_of_sql = _sql_literal(as_of)
+    return f"(START_DATE IS NULL OR START_DATE <= {as_of_sql}) AND (END_DATE IS NULL OR END_DATE >= {as_of_sql})"
+
+
+def _neighbor_edges_query(node_keys, as_of, limit):
+    """Build a query for WORKED_FOR and REPORTED_TO edges touching any of the given nodes."""
+    ids = {"CONTACT": [], "COMPANY": []}
+    for key in node_keys:
+        node_type, node_id = _split_node_key(key)
+        ids[node_type].append(_sql_literal(node_id))
+
+    selects = []
+    for edge_type, config in EDGE_TABLES.items():
+        conditions = []
+        if ids[config["from_node_type"]]:
+            conditions.append(f"FROM_NODE_ID IN ({', '.join(ids[config['from_node_type']])})")
+        if ids[config["to_node_type"]]:
+            conditions.append(f"TO_NODE_ID IN ({', '.join(ids[config['to_node_type']])})")
+        if not conditions:
+            continue
+        selects.append(f"""
+        SELECT
+            '{edge_type}' AS EDGE_TYPE,
+            '{config['from_node_type']}' AS FROM_NODE_TYPE, FROM_NODE_ID,
+            '{config['to_node_type']}' AS TO_NODE_TYPE, TO_NODE_ID
+        FROM {config['table']}
+        WHERE ({" OR ".join(conditions)}) AND {_as_of_filter(as_of)}""")
+
+    if not selects:
+        return None
+    return " UNION ALL ".join(selects) + f"\nLIMIT {limit}"
+
+
+def _fetch_neighbor_edges(node_keys, as_of):
+    """Fetch WORKED_FOR and REPORTED_TO edges touching any of the given nodes.
+
+    Node IDs are sent in batches of NEIGHBOR_ID_BATCH_SIZE so no IN list
+    exceeds Snowflake's limit. At most MAX_EDGES_PER_HOP edges are returned;
+    the second value is True when edges were left out, either because that
+    limit was reached or because a batch failed. Reads are uncached; the
+    ego network caches are cleared on every edge write instead.
+    """
+    node_keys = list(node_keys)
+    frames = []
+    fetched = 0
+    truncated = False
+    for start in range(0, len(node_keys), NEIGHBOR_ID_BATCH_SIZE):
+        remaining = MAX_EDGES_PER_HOP - fetched
+        if remaining <= 0:
+            truncated = True
+            break
+        # Ask for one extra row to tell a full batch from a truncated one
+        query = _neighbor_edges_query(node_keys[start:start + NEIGHBOR_ID_BATCH_SIZE], as_of, remaining + 1)
+        if query is None:
+            continue
+        df = execute_snowflake_statement(query)
+        if df is None:
+            truncated = True
+            continue
+        if len(df) > remaining:
+            df = df.head(remaining)
+            truncated = True
+        fetched += len(df)
+        frames.append(df)
+
+    frames = [df for df in frames if len(df) > 0]
+    if not frames:
+        return pd.DataFrame(columns=["SOURCE", "TARGET", "EDGE_TYPE"]), truncated
+    df = pd.concat(frames)
+    edges = pd.DataFrame({
+        "SOURCE": df["FROM_NODE_TYPE"] + ":" + df["FROM_NODE_ID"].astype(str),
+        "TARGET": df["TO_NODE_TYPE"] + ":" + df["TO_NODE_ID"].astype(str),
+        "EDGE_TYPE": df["EDGE_TYPE"],
+    })
+    # Edges between two frontier nodes in different batches are returned twice
+    return edges.drop_duplicates().reset_index(drop=True), truncated
+
+
+def _expand_hops(seed_keys, depth, as_of, known_hops=None, known_parents=None):
+    """Breadth-first expansion from seed nodes, one round of queries per hop.
+
+    Returns the raw edges found, the hop distance of every reached node, the
+    node each one was first reached through (its parent) and whether any hop
+    was truncated.
+    """
+    hops = dict(known_hops or {})
+    parents = dict(known_parents or {})
+    for key in seed_keys:
+        hops.setdefault(key, 0)
+    frontier = list(seed_keys)
+    start_hop = min(hops[key] for key in seed_keys)
+    edges = []
+    truncated = False
+
+    for hop in range(start_hop + 1, start_hop + depth + 1):
+        if not frontier:
+            break
+        found, hop_truncated = _fetch_neighbor_edges(frontier, as_of)
+        truncated = truncated or hop_truncated
+        edges.append(found)
+
+        # Pair every edge endpoint with the frontier node on its other end
+        in_frontier = set(frontier)
+        reached = pd.concat([
+            found[found["SOURCE"].isin(in_frontier)].rename(columns={"SOURCE": "PARENT", "TARGET": "KEY"}),
+            found[found["TARGET"].isin(in_frontier)].rename(columns={"TARGET": "PARENT", "SOURCE": "KEY"}),
+        ])[["KEY", "PARENT"]]
+        reached = reached[~reached["KEY"].isin(hops.keys())].sort_values(["KEY", "PARENT"])
+        reached = reached.drop_duplicates("KEY")
+
+        frontier = list(reached["KEY"])
+        for key, parent in zip(reached["KEY"], reached["PARENT"]):
+            hops[key] = hop
+            parents[key] = parent
+
+    if not edges:
+        return pd.DataFrame(columns=["SOURCE", "TARGET", "EDGE_TYPE"]), hops, parents, truncated
+    return pd.concat(edges).drop_duplicates().reset_index(drop=True), hops, parents, truncated
+
+
+def collapse_large_companies(edges, hops, parents, focus_key, threshold):
+    """Collapse the employees of large companies into cluster nodes.
+
+    A contact belongs to the company it was reached through, so employees
+    with other employers still count towards that company. For every company
+    that reached more than threshold contacts, the best-connected ones are
+    kept and the rest are replaced by one cluster node, together with
+    everything that was reached only through them (their other employers and
+    beyond). Edges are redirected to the cluster and aggregated.
+    Returns the aggregated edges (with WEIGHT) and cluster sizes by key.
+    """
+    degree = pd.concat([edges["SOURCE"], edges["TARGET"]]).value_counts()
+    reached = pd.DataFrame({"KEY": list(parents.keys()), "PARENT": list(parents.values())}, dtype=object)
+    members = reached[
+        reached["KEY"].str.startswith("CONTACT:")
+        & reached["PARENT"].str.startswith("COMPANY:")
+        & (reached["KEY"] != focus_key)
+    ]
+    members = members.assign(DEGREE=members["KEY"].map(degree).fillna(0)).sort_values(
+        ["PARENT", "DEGREE", "KEY"], ascending=[True, False, True]
+    )
+    overflow = members[members.groupby("PARENT").cumcount() >= threshold]
+    collapsed = dict(zip(overflow["KEY"], "CLUSTER:" + overflow["PARENT"]))
+
+    # Nodes reached through a collapsed node join the same cluster, nearest hops first
+    for key in sorted(parents, key=lambda key: hops.get(key, 0)):
+        if key not in collapsed and parents[key] in collapsed:
+            collapsed[key] = collapsed[parents[key]]
+    cluster_sizes = pd.Series(collapsed, dtype=object).value_counts().to_dict()
+
+    edges = edges.assign(
+        SOURCE=edges["SOURCE"].map(lambda key: collapsed.get(key, key)),
+        TARGET=edges["TARGET"].map(lambda key: collapsed.get(key, key)),
+    )
+    edges = edges[edges["SOURCE"] != edges["TARGET"]]
+    aggregated = edges.groupby(["SOURCE", "TARGET", "EDGE_TYPE"]).size().rename("WEIGHT").reset_index()
+
+    for cluster_key in cluster_sizes:
+        company_key = cluster_key.split(":", 1)[1]
+        hops[cluster_key] = hops.get(company_key, 0) + 1
+    return aggregated, cluster_sizes
+
+
+def limit_network_nodes(edges, hops, focus_key, max_nodes=MAX_NETWORK_NODES):
+    """Keep at most max_nodes nodes, preferring near and well-connected ones.
+
+    Returns the edges between kept nodes, the kept node keys and the number
+    of nodes dropped.
+    """
+    node_keys = pd.Series(list(dict.fromkeys([focus_key, *edges["SOURCE"], *edges["TARGET"]])))
+    if len(node_keys) <= max_nodes:
+        return edges, list(node_keys), 0
+
+    degree = pd.concat([edges["SOURCE"], edges["TARGET"]]).value_counts()
+    ranked = pd.DataFrame({
+        "KEY": node_keys,
+        "FOCUS": node_keys != focus_key,
+        "HOP": node_keys.map(lambda key: hops.get(key, 0)),
+        "DEGREE": node_keys.map(degree).fillna(0),
+    }).sort_values(["FOCUS", "HOP", "DEGREE", "KEY"], ascending=[True, True, False, True])
+    kept = list(ranked["KEY"].head(max_nodes))
+    kept_set = set(kept)
+    edges = edges[edges["SOURCE"].isin(kept_set) & edges["TARGET"].isin(kept_set)]
+    return edges, kept, len(node_keys) - max_nodes
+
+
+def _repulsion(positions, k):
+    """Fruchterman-Reingold repulsive displacement of every node.
+
+    Small graphs use exact pairwise forces. Larger ones bin nodes into a
+    LAYOUT_GRID_SIZE x LAYOUT_GRID_SIZE grid and let each occupied cell
+    repel as one mass at its centroid, which keeps memory and time linear
+    in the number of nodes.
+    """
+    n = len(positions)
+    if n <= EXACT_REPULSION_NODES:
+        delta = positions[:, None, :] - positions[None, :, :]
+        distance = np.maximum(np.linalg.norm(delta, axis=-1), 1e-3)
+        return np.einsum("ijk,ij->ik", delta, (k * k) / distance ** 2)
+
+    low = positions.min(axis=0)
+    span = np.maximum(positions.max(axis=0) - low, 1e-9)
+    cell = np.minimum(((positions - low) / span * LAYOUT_GRID_SIZE).astype(int), LAYOUT_GRID_SIZE - 1)
+    cells, cell_index, counts = np.unique(
+        cell[:, 0] * LAYOUT_GRID_SIZE + cell[:, 1], return_inverse=True, return_counts=True
+    )
+    cell_index = cell_index.ravel()
+    sums = np.zeros((len(cells), 2))
+    np.add.at(sums, cell_index, positions)
+
+    # Other cells repel as point masses at their centroids
+    centroids = sums / counts[:, None]
+    dx = positions[:, 0, None] - centroids[None, :, 0]
+    dy = positions[:, 1, None] - centroids[None, :, 1]
+    weight = counts[None, :] * (k * k) / np.maximum(dx * dx + dy * dy, 1e-6)
+    weight[np.arange(n), cell_index] = 0
+    displacement = np.column_stack([(dx * weight).sum(axis=1), (dy * weight).sum(axis=1)])
+
+    # A node's own cell repels from the centroid of its other members
+    others = counts[cell_index] - 1
+    has_others = others > 0
+    own_delta = positions[has_others] - (sums[cell_index] - positions)[has_others] / others[has_others, None]
+    own_distance = np.maximum(np.linalg.norm(own_delta, axis=-1), 1e-3)
+    displacement[has_others] += own_delta * (others[has_others] * (k * k) / own_distance ** 2)[:, None]
+    return displacement
+
+
+def compute_layout(node_keys, edges, pinned=None, iterations=LAYOUT_ITERATIONS, seed=0):
+    """Force-directed (Fruchterman-Reingold) layout computed with numpy.
+
+    Nodes in pinned keep their positions so an expanded graph only moves
+    the new nodes, which start next to an already placed neighbour.
+    Callers bound the node count with limit_network_nodes first.
+    Returns a dict of node key -> (x, y).
+    """
+    pinned = pinned or {}
+    rng = np.random.default_rng(seed)
+    keys = list(node_keys)
+    index = {key: i for i, key in enumerate(keys)}
+    n = len(keys)
+    if n == 0:
+        return {}
+
+    positions = rng.uniform(-1, 1, size=(n, 2))
+    fixed = np.zeros(n, dtype=bool)
+    for key, xy in pinned.items():
+        if key in index:
+            positions[index[key]] = xy
+            fixed[index[key]] = True
+
+    source = edges["SOURCE"].map(index).to_numpy()
+    target = edges["TARGET"].map(index).to_numpy()
+    valid = ~(pd.isna(source) | pd.isna(target))
+    source, target = source[valid].astype(int), target[valid].astype(int)
+
+    # Start new nodes near a placed neighbour when there is one
+    for s, t in zip(source, target):
+        if fixed[s] and not fixed[t]:
+            positions[t] = positions[s] + rng.normal(scale=0.05, size=2)
+        elif fixed[t] and not fixed[s]:
+            positions[s] = positions[t] + rng.normal(scale=0.05, size=2)
+
+    if fixed.all():
+        return {key: tuple(positions[i]) for i, key in enumerate(keys)}
+
+    k = np.sqrt(4.0 / n)
+    temperature = 0.1
+    for _ in range(iterations):
+        displacement = _repulsion(positions, k)
+
+        edge_delta = positions[source] - positions[target]
+        edge_distance = np.maximum(np.linalg.norm(edge_delta, axis=-1), 1e-3)
+        attraction = edge_delta * (edge_distance / k)[:, None]
+        np.add.at(displacement, source, -attraction)
+        np.add.at(displacement, target, attraction)
+
+        length = np.maximum(np.linalg.norm(displacement, axis=-1), 1e-3)
+        step = displacement * (np.minimum(length, temperature) / length)[:, None]
+        step[fixed] = 0
+        positions += step
+        temperature *= 0.95
+
+    return {key: tuple(positions[i]) for i, key in enumerate(keys)}
+
+
+def _build_network(edges, hops, parents, truncated, focus_key, cluster_threshold, pinned):
+    """Apply level-of-detail, lay out and label a raw ego network."""
+    edges, cluster_sizes = collapse_large_companies(edges, hops, parents, focus_key, cluster_threshold)
+    edges, node_keys, hidden_nodes = limit_network_nodes(edges, hops, focus_key)
+    positions = compute_layout(node_keys, edges, pinned=pinned)
+
+    rows = []
+    for key in node_keys:
+        node_type, node_id = _split_node_key(key)
+        if node_type == "CLUSTER":
+            company_label = get_node_label(*_split_node_key(node_id))
+            label = f"{company_label}: +{cluster_sizes.get(key, 0)} more"
+        else:
+            label = get_node_label(node_type, node_id)
+        rows.append({
+            "KEY": key,
+            "NODE_TYPE": node_type,
+            "NODE_ID": node_id,
+            "LABEL": label,
+            "HOP": hops.get(key, 0),
+            "SIZE": cluster_sizes.get(key, 1),
+            "X": positions[key][0],
+            "Y": positions[key][1],
+        })
+    nodes = pd.DataFrame(rows)
+
+    xy = nodes.set_index("KEY")[["X", "Y"]]
+    edges = edges.join(xy, on="SOURCE").join(xy.rename(columns={"X": "X2", "Y": "Y2"}), on="TARGET")
+    return {"nodes": nodes, "edges": edges, "hops": hops, "truncated": truncated, "hidden_nodes": hidden_nodes}
+
+
+@st.cache_data(max_entries=200)
+def _get_raw_ego_network(node_type, node_id, depth, as_of, expanded):
+    """Raw (pre level-of-detail) edges, hops, parents and truncation, extended one expansion at a time."""
+    if expanded:
+        edges, hops, parents, truncated = _get_raw_ego_network(node_type, node_id, depth, as_of, expanded[:-1])
+        new_edges, hops, parents, new_truncated = _expand_hops(
+            [expanded[-1]], 1, as_of, known_hops=hops, known_parents=parents
+        )
+        edges = pd.concat([edges, new_edges]).drop_duplicates().reset_index(drop=True)
+        return edges, hops, parents, truncated or new_truncated
+    return _expand_hops([node_key(node_type, node_id)], depth, as_of)
+
+
+@st.cache_data(max_entries=200)
+def get_ego_network(node_type, node_id, depth=1, as_of=None, expanded=(), cluster_threshold=DEFAULT_CLUSTER_THRESHOLD):
+    """Return a laid-out ego network around a contact or company.
+
+    Results are cached per (node, depth, as-of, expansions). Expanding a node
+    reuses the cached layout of the previous view and pins its positions, so
+    only the newly revealed nodes are placed. The result reports whether edge
+    fetching was truncated and how many nodes were dropped by the node cap.
+    """
+    focus_key = node_key(node_type, node_id)
+    edges, hops, parents, truncated = _get_raw_ego_network(node_type, node_id, depth, as_of, tuple(expanded))
+    pinned = None
+    if expanded:
+        previous = get_ego_network(node_type, node_id, depth, as_of, tuple(expanded[:-1]), cluster_threshold)
+        pinned = {row.KEY: (row.X, row.Y) for row in previous["nodes"].itertuples()}
+    return _build_network(edges, dict(hops), parents, truncated, focus_key, cluster_threshold, pinned)
+
+
+# Edge writes in utils invalidate the cached networks
+register_edge_cache(_get_raw_ego_network.clear)
+register_edge_cache(get_ego_network.clear)
@@ -5,8 +5,10 @@ import streamlit as st
 from utils import (
     get_companies_data, 
     display_table_info, 
+    format_summary_updated_at,
     show_relationship_management_for_company,
-    search_companies_by_domain
+    search_companies_by_domain,
+    start_background_jobs
 )
 
 st.set_page_config(
@@ -15,6 +17,8 @@ st.set_page_config(
     layout="wide"
 )
 
+start_background_jobs()
+
 def show_companies_page():
     """Display the Companies page."""
     st.header("🏢 Companies")
@@ -46,6 +50,11 @@ def show_companies_page():
                     col1, col2 = st.columns([3, 1])
                     with col1:
                         st.write(f"**{row.get('NAME', 'Unknown')}** - {row.get('DOMAIN', 'No domain')}")
+                        st.caption(
+                            f"👥 {row.get('CURRENT_EMPLOYEE_COUNT', 0)} current · "
+                            f"{row.get('FORMER_EMPLOYEE_COUNT', 0)} former employees"
+                            f"{format_summary_updated_at(row.get('UPDATED_AT'))}"
+                        )
                     with col2:
                         if st.button(f"View", key=f"view_company_{row['ID']}"):
                             st.query_params["id"] = row['ID']
@@ -5,8 +5,10 @@ import streamlit as st
 from utils import (
     get_contacts_data, 
     display_table_info, 
+    format_summary_updated_at,
     show_relationship_management_for_contact,
-    search_contacts_by_email
+    search_contacts_by_email,
+    start_background_jobs
 )
 
 st.set_page_config(
@@ -15,6 +17,8 @@ st.set_page_config(
     layout="wide"
 )
 
+start_background_jobs()
+
 def show_contacts_page():
     """Display the Contacts page."""
     st.header("👥 Contacts")
@@ -51,6 +55,12 @@ def show_contacts_page():
                         if not name:
                             name = f"ID: {row['ID']}"
                         st.write(f"**{name}** - {row.get('EMAIL', 'No email')}")
+                        employer = row.get('LATEST_EMPLOYER_NAME') or row.get('LATEST_EMPLOYER_ID')
+                        employer_text = f"🏢 {employer} · " if employer else ""
+                        st.caption(
+                            f"{employer_text}👥 {row.get('DIRECT_REPORT_COUNT', 0)} direct reports"
+                            f"{format_summary_updated_at(row.get('UPDATED_AT'))}"
+                        )
                     with col2:
                         if st.button(f"View", key=f"view_contact_{row['ID']}"):
                             st.query_params["id"] = row['ID']
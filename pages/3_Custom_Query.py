@@ -2,7 +2,16 @@
 Custom Query page - Execute custom SQL queries for advanced analysis
 """
 import streamlit as st
-from utils import execute_snowflake_query, display_table_info
+from utils import (
+    display_table_info,
+    get_query_guardrails,
+    get_query_user,
+    get_remaining_query_budget,
+    apply_default_limit,
+    explain_query,
+    requires_query_confirmation,
+    execute_guarded_query
+)
 
 st.set_page_config(
     page_title="Custom Query - People Card",
@@ -58,24 +67,102 @@ def show_query_page():
         help="Enter any valid SQL query to analyze the People Card data"
     )
     
-    # Execute button
+    guardrails = get_query_guardrails()
+    user = get_query_user()
+    remaining = get_remaining_query_budget(user, guardrails)
+    
+    exploratory = st.checkbox(
+        f"Exploratory run (add LIMIT {guardrails['default_limit']} if the query has none)",
+        value=True,
+        help="Bounds the result size of SELECT queries while you explore"
+    )
+    st.caption(
+        f"Query time budget: {remaining:.0f}s of {guardrails['time_budget_seconds']}s remaining "
+        f"this {guardrails['time_budget_window_seconds'] // 60} minute window"
+    )
+    
+    # Execute button runs a pre-flight EXPLAIN before anything touches the warehouse
     if st.button("Execute Query", type="primary"):
         if not query.strip():
             st.error("Please enter a SQL query")
+            st.session_state.pop("query_preflight", None)
         else:
-            with st.spinner("Executing query..."):
-                df = execute_snowflake_query(query)
-                
-                if df is not None:
-                    st.success(f"Query executed successfully! Returned {len(df)} rows.")
-                    
-                    # Display results
-                    st.subheader("Query Results")
-                    st.dataframe(df, use_container_width=True)
-                    
-                    # Show basic info about the results
-                    if len(df) > 0:
-                        display_table_info(df, "Query Results")
+            if exploratory:
+                statement, limited = apply_default_limit(query, guardrails["default_limit"])
+            else:
+                statement, limited = query.strip().rstrip(";"), False
+            with st.spinner("Estimating query cost..."):
+                estimate = explain_query(statement)
+            st.session_state.query_preflight = {
+                "query": query,
+                "exploratory": exploratory,
+                "statement": statement,
+                "limited": limited,
+                "estimate": estimate,
+                "confirmed": not requires_query_confirmation(estimate, guardrails),
+            }
+    
+    # Discard a pending estimate once the query on screen no longer matches it
+    preflight = st.session_state.get("query_preflight")
+    if preflight and (preflight["query"] != query or preflight["exploratory"] != exploratory):
+        st.session_state.pop("query_preflight", None)
+        preflight = None
+    
+    if preflight:
+        show_query_estimate(preflight)
+        
+        if not preflight["confirmed"]:
+            if preflight["estimate"] is None:
+                st.warning("The cost of this query could not be estimated. Please confirm before running it.")
+            else:
+                st.warning("This query exceeds the configured scan thresholds. Please confirm before running it.")
+            if st.button("Run Anyway", type="secondary"):
+                preflight["confirmed"] = True
+        
+        if preflight["confirmed"]:
+            st.session_state.pop("query_preflight", None)
+            run_query(preflight["statement"], user, guardrails)
+
+
+def show_query_estimate(preflight):
+    """Display the pre-flight cost estimate for a query."""
+    st.write("**Pre-flight Estimate:**")
+    if preflight["limited"]:
+        st.info("A LIMIT was added for this exploratory run.")
+    
+    estimate = preflight["estimate"]
+    if estimate is None:
+        st.info("EXPLAIN is not available for this statement")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        partitions = estimate.get("partitions_assigned")
+        total = estimate.get("partitions_total")
+        st.metric("Partitions", f"{partitions:,} of {total:,}" if partitions is not None and total is not None else "n/a")
+    with col2:
+        bytes_assigned = estimate.get("bytes_assigned")
+        st.metric("Bytes Scanned", f"{bytes_assigned / 1024 ** 2:,.1f} MB" if bytes_assigned is not None else "n/a")
+    with col3:
+        rows = estimate.get("rows")
+        st.metric("Rows", f"{rows:,}" if rows is not None else "n/a")
+
+
+def run_query(statement, user, guardrails):
+    """Execute a query that passed pre-flight and display its results."""
+    with st.spinner("Executing query..."):
+        df = execute_guarded_query(statement, user, guardrails)
+        
+        if df is not None:
+            st.success(f"Query executed successfully! Returned {len(df)} rows.")
+            
+            # Display results
+            st.subheader("Query Results")
+            st.dataframe(df, use_container_width=True)
+            
+            # Show basic info about the results
+            if len(df) > 0:
+                display_table_info(df, "Query Results")
 
 # Run the page
 show_query_page()
\ No newline at end of file
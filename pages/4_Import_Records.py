@@ -0,0 +1,87 @@
+"""
+Import Records page - Match HRIS/LinkedIn records to contacts and companies
+"""
+import streamlit as st
+from utils import start_background_jobs
+
+st.set_page_config(
+    page_title="Import Records - People Card",
+    page_icon="📥",
+    layout="wide"
+)
+
+start_background_jobs()
+
+def show_import_page():
+    """Display the Import Records page."""
+    st.header("📥 Import Records")
+    st.write("Match employment records from external systems to contacts and companies, then import them as WORKED_FOR relationships")
+    
+    # Deferred so the header renders before pandas is loaded
+    import pandas as pd
+    from matching import (
+        EXTERNAL_RECORD_COLUMNS,
+        accepted_matches,
+        match_external_records,
+        import_matched_worked_for
+    )
+    
+    with st.expander("📖 Expected Columns"):
+        st.write("Upload a CSV with any of the following columns (case-insensitive):")
+        st.write(EXTERNAL_RECORD_COLUMNS)
+    
+    uploaded_file = st.file_uploader("Upload Records (CSV)", type=["csv"])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        source_system = st.selectbox("Source System", options=["HRIS", "LINKEDIN"])
+    with col2:
+        min_confidence = st.slider(
+            "Minimum Confidence",
+            min_value=0.0,
+            max_value=1.0,
+            value=0.8,
+            step=0.05,
+            help="Only matches at or above this confidence are imported"
+        )
+    
+    if uploaded_file is not None and st.button("Match Records", type="primary"):
+        records = pd.read_csv(uploaded_file)
+        with st.spinner(f"Matching {len(records)} records..."):
+            matched = match_external_records(records)
+        if matched is None:
+            st.error("Node snapshots are not available yet. Run `python utils.py` to build them.")
+        else:
+            st.session_state.matched_records = matched
+    
+    # Display matches if available
+    if 'matched_records' in st.session_state:
+        matched = st.session_state.matched_records
+        accepted = accepted_matches(matched, min_confidence)
+        rejected = matched[matched["REJECT_REASON"].notna()]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Records", len(matched))
+        with col2:
+            st.metric("Matched", len(accepted))
+        with col3:
+            st.metric("Below Threshold", len(matched) - len(accepted) - len(rejected))
+        with col4:
+            st.metric("Rejected", len(rejected))
+        
+        if len(rejected) > 0:
+            st.warning(f"{len(rejected)} records have invalid dates and will not be imported")
+            with st.expander("Rejected Records"):
+                st.dataframe(rejected, use_container_width=True)
+        
+        st.subheader("Match Results")
+        st.dataframe(matched, use_container_width=True)
+        
+        if st.button(f"Import {len(accepted)} Relationships", disabled=len(accepted) == 0):
+            with st.spinner("Importing relationships..."):
+                counts = import_matched_worked_for(matched, source_system, min_confidence)
+            st.success(f"Import complete! {counts['inserted']} inserted, {counts['updated']} updated.")
+
+# Run the page
+show_import_page()
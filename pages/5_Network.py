@@ -0,0 +1,163 @@
+"""
+Network page - Visualize the ego network around a contact or company
+"""
+import streamlit as st
+from utils import (
+    get_node_label,
+    search_companies_by_domain,
+    search_contacts_by_email,
+    start_background_jobs
+)
+
+st.set_page_config(
+    page_title="Network - People Card",
+    page_icon="🕸️",
+    layout="wide"
+)
+
+start_background_jobs()
+
+NODE_COLORS = {
+    "CONTACT": "#1f77b4",
+    "COMPANY": "#ff7f0e",
+    "CLUSTER": "#bbbbbb",
+}
+
+def select_focus_node():
+    """Pick the node to center the network on, from the URL or a search."""
+    query_params = st.query_params
+    if query_params.get("id") and query_params.get("type") in ("CONTACT", "COMPANY"):
+        if st.button("Change focus"):
+            st.query_params.clear()
+            st.session_state.network_expanded = ()
+            st.session_state.pop("network_focus", None)
+            st.rerun()
+        return query_params.get("type"), query_params.get("id")
+    
+    node_type = st.radio("Center on", options=["CONTACT", "COMPANY"], format_func=str.title, horizontal=True)
+    if node_type == "CONTACT":
+        search = st.text_input("Search Contact by Email", placeholder="john@example.com")
+        results = search_contacts_by_email(search) if search else None
+        label_column = "EMAIL"
+    else:
+        search = st.text_input("Search Company by Domain", placeholder="example.com")
+        results = search_companies_by_domain(search) if search else None
+        label_column = "DOMAIN"
+    
+    if results is None or len(results) == 0:
+        if search:
+            st.info("No matches found. Try a different search.")
+        return None, None
+    
+    options = {f"{get_node_label(node_type, row['ID'])} ({row.get(label_column)})": row['ID'] for _, row in results.iterrows()}
+    selected = st.selectbox("Select", options=list(options.keys()))
+    if st.button("Show Network", type="primary"):
+        st.query_params["type"] = node_type
+        st.query_params["id"] = options[selected]
+        st.rerun()
+    return None, None
+
+
+def show_network_chart(network):
+    """Render a laid-out network as an interactive chart."""
+    import altair as alt
+    
+    edges = alt.Chart(network["edges"]).mark_rule(opacity=0.4).encode(
+        x=alt.X("X:Q", axis=None),
+        y=alt.Y("Y:Q", axis=None),
+        x2="X2:Q",
+        y2="Y2:Q",
+        strokeWidth=alt.StrokeWidth("WEIGHT:Q", scale=alt.Scale(range=[0.5, 4]), legend=None),
+        strokeDash=alt.StrokeDash("EDGE_TYPE:N", title="Relationship")
+    )
+    nodes = alt.Chart(network["nodes"]).mark_circle(opacity=0.9).encode(
+        x="X:Q",
+        y="Y:Q",
+        size=alt.Size("SIZE:Q", scale=alt.Scale(range=[60, 1200]), legend=None),
+        color=alt.Color(
+            "NODE_TYPE:N",
+            scale=alt.Scale(domain=list(NODE_COLORS), range=list(NODE_COLORS.values())),
+            title="Node"
+        ),
+        tooltip=["LABEL:N", "NODE_TYPE:N", "HOP:Q", "SIZE:Q"]
+    )
+    st.altair_chart((edges + nodes).interactive(), use_container_width=True)
+
+
+def show_network_page():
+    """Display the Network page."""
+    st.header("🕸️ Network")
+    st.write("Visualize career paths and company connections around a contact or company")
+    
+    # Deferred so the header renders before numpy and pandas are loaded
+    from network import DEFAULT_CLUSTER_THRESHOLD, get_ego_network, node_key
+    
+    node_type, node_id = select_focus_node()
+    if not node_id:
+        return
+    
+    focus = node_key(node_type, node_id)
+    st.subheader(f"Network around {get_node_label(node_type, node_id)}")
+    
+    # Reset expansions when the focus node changes
+    if st.session_state.get("network_focus") != focus:
+        st.session_state.network_focus = focus
+        st.session_state.network_expanded = ()
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        depth = st.slider("Hops", min_value=1, max_value=3, value=2)
+    with col2:
+        as_of = st.date_input("As of (leave empty for all history)", value=None)
+    with col3:
+        cluster_threshold = st.slider(
+            "Cluster companies above",
+            min_value=5,
+            max_value=200,
+            value=DEFAULT_CLUSTER_THRESHOLD,
+            help="Companies with more employees in view are shown as a cluster node"
+        )
+    
+    with st.spinner("Building network..."):
+        network = get_ego_network(
+            node_type, node_id, depth, as_of, st.session_state.network_expanded, cluster_threshold
+        )
+    
+    if network["truncated"]:
+        st.warning("Some relationships could not be loaded, so this network is incomplete. Try fewer hops or an as-of date.")
+    if network["hidden_nodes"]:
+        st.warning(f"{network['hidden_nodes']} of the most distant nodes are hidden to keep the chart readable.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Nodes", len(network["nodes"]))
+    with col2:
+        st.metric("Edges", int(network["edges"]["WEIGHT"].sum()) if len(network["edges"]) > 0 else 0)
+    
+    show_network_chart(network)
+    
+    # Expand a node by one more hop, keeping the current layout in place
+    expandable = network["nodes"][
+        (network["nodes"]["NODE_TYPE"] != "CLUSTER")
+        & (~network["nodes"]["KEY"].isin(st.session_state.network_expanded))
+        & (network["nodes"]["KEY"] != focus)
+    ]
+    if len(expandable) > 0:
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            options = dict(zip(expandable["LABEL"] + " (" + expandable["NODE_TYPE"].str.title() + ")", expandable["KEY"]))
+            selected = st.selectbox("Expand Node", options=list(options.keys()))
+        with col2:
+            if st.button("Expand", use_container_width=True):
+                st.session_state.network_expanded = (*st.session_state.network_expanded, options[selected])
+                st.rerun()
+        with col3:
+            if st.button("Reset", use_container_width=True, disabled=not st.session_state.network_expanded):
+                st.session_state.network_expanded = ()
+                st.rerun()
+    
+    with st.expander("Nodes"):
+        st.dataframe(network["nodes"][["LABEL", "NODE_TYPE", "NODE_ID", "HOP", "SIZE"]], use_container_width=True)
+
+# Run the page
+show_network_page()
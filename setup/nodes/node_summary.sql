@@ -0,0 +1,67 @@
+-- Create NODE_SUMMARY table
+-- Precomputed per-node degree and summary fields, maintained by the app on every edge write
+-- One row per (NODE_TYPE, NODE_ID) for nodes that appear in WORKED_FOR or REPORTED_TO
+
+USE DATABASE SANDBOX_NRILEY;
+USE SCHEMA GRAPH_EDGES;
+
+CREATE OR REPLACE TABLE NODE_SUMMARY (
+    -- Node identity
+    NODE_TYPE STRING NOT NULL,            -- 'CONTACT' or 'COMPANY'
+    NODE_ID STRING NOT NULL,              -- References CONTACTS.ID or COMPANIES.ID
+
+    -- Company fields (0 for contacts)
+    CURRENT_EMPLOYEE_COUNT NUMBER DEFAULT 0,  -- Distinct contacts with a current WORKED_FOR edge
+    FORMER_EMPLOYEE_COUNT NUMBER DEFAULT 0,   -- Distinct contacts whose WORKED_FOR edges have all ended
+
+    -- Contact fields (0 / NULL for companies)
+    DIRECT_REPORT_COUNT NUMBER DEFAULT 0,     -- Current DIRECT_REPORT edges pointing at this contact
+    LATEST_EMPLOYER_ID STRING,                -- Current (or most recent) WORKED_FOR company
+
+    UPDATED_AT TIMESTAMP_NTZ DEFAULT CURRENT_TIMESTAMP(),
+
+    PRIMARY KEY (NODE_TYPE, NODE_ID)
+)
+COMMENT = 'Per-node degree and summary fields for search result cards. Maintained incrementally by the app on edge inserts, updates and deletes';
+
+-- Grant permissions
+GRANT SELECT, INSERT, UPDATE, DELETE ON TABLE NODE_SUMMARY TO ROLE SYSADMIN;
+
+-- Backfill from existing edges (only needed once, the app keeps it current afterwards)
+INSERT INTO NODE_SUMMARY (NODE_TYPE, NODE_ID, CURRENT_EMPLOYEE_COUNT, FORMER_EMPLOYEE_COUNT)
+SELECT
+    'COMPANY',
+    TO_NODE_ID,
+    COUNT(DISTINCT IFF(IS_CURRENT, FROM_NODE_ID, NULL)),
+    COUNT(DISTINCT FROM_NODE_ID) - COUNT(DISTINCT IFF(IS_CURRENT, FROM_NODE_ID, NULL))
+FROM WORKED_FOR
+GROUP BY TO_NODE_ID;
+
+INSERT INTO NODE_SUMMARY (NODE_TYPE, NODE_ID, DIRECT_REPORT_COUNT, LATEST_EMPLOYER_ID)
+WITH contact_ids AS (
+    SELECT FROM_NODE_ID AS ID FROM WORKED_FOR
+    UNION
+    SELECT FROM_NODE_ID FROM REPORTED_TO
+    UNION
+    SELECT TO_NODE_ID FROM REPORTED_TO
+),
+reports AS (
+    SELECT TO_NODE_ID AS ID, COUNT(DISTINCT FROM_NODE_ID) AS DIRECT_REPORT_COUNT
+    FROM REPORTED_TO
+    WHERE IS_CURRENT AND COALESCE(RELATIONSHIP_TYPE, 'DIRECT_REPORT') = 'DIRECT_REPORT'
+    GROUP BY TO_NODE_ID
+),
+latest_employer AS (
+    SELECT FROM_NODE_ID AS ID, TO_NODE_ID AS LATEST_EMPLOYER_ID
+    FROM WORKED_FOR
+    QUALIFY ROW_NUMBER() OVER (
+        PARTITION BY FROM_NODE_ID ORDER BY IS_CURRENT DESC NULLS LAST, START_DATE DESC NULLS LAST
+    ) = 1
+)
+SELECT 'CONTACT', c.ID, COALESCE(r.DIRECT_REPORT_COUNT, 0), l.LATEST_EMPLOYER_ID
+FROM contact_ids c
+LEFT JOIN reports r ON r.ID = c.ID
+LEFT JOIN latest_employer l ON l.ID = c.ID;
+
+-- Show table structure
+DESCRIBE TABLE NODE_SUMMARY;
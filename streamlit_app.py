@@ -5,6 +5,7 @@ Explore and visualize professional relationships between people and companies.
 Navigate to different pages using the sidebar.
 """
 import streamlit as st
+from utils import start_background_jobs, show_startup_report
 
 st.set_page_config(
     page_title="People Card",
@@ -12,6 +13,11 @@ st.set_page_config(
     layout="wide"
 )
 
+# Load the data layer and keep node snapshots fresh in the background,
+# so this page renders without waiting on either
+start_background_jobs()
+show_startup_report()
+
 # Main page content
 st.title("👤 People Card")
 st.subheader("Explore Professional Networks and Relationships")
@@ -27,6 +33,7 @@ People Card helps you discover and explore professional relationships within you
 - Use the **Companies** page to search by company domain
 - Use the **Contacts** page to search by email address
 - Click "View" on any result to see detailed relationship information
+- Use the **Network** page to see everyone within a few hops of a person or company
 
 👥 **Explore Professional Networks**
 - See who worked for which companies
@@ -1,16 +1,121 @@
 """
 Shared utility functions for the HubSpot CRM Data Explorer
+
+Heavy dependencies (pandas, pyarrow) and the Snowflake connection are loaded
+on first data access rather than at import time, so pages that do not touch
+data render immediately.
 """
+import bisect
+import datetime
+import importlib
+import logging
+import math
+import numbers
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
+
+_IMPORT_STARTED = time.perf_counter()
+
+logger = logging.getLogger(__name__)
+
+
+# Snapshot configuration for the compact node tables
+SNAPSHOT_DIR = Path(os.environ.get("PEOPLE_CARD_SNAPSHOT_DIR", ".snapshots"))
+SNAPSHOT_REFRESH_SECONDS = int(os.environ.get("PEOPLE_CARD_SNAPSHOT_REFRESH_SECONDS", "3600"))
+NODE_SNAPSHOT_SOURCES = {
+    "COMPANY": {
+        "table": "PROD_HUBSPOT.HUBSPOT_CRM.COMPANIES",
+        "columns": ["ID", "DOMAIN", "NAME"],
+    },
+    "CONTACT": {
+        "table": "PROD_HUBSPOT.HUBSPOT_CRM.CONTACTS",
+        "columns": ["ID", "EMAIL", "PROPERTIES_FIRSTNAME_VALUE", "PROPERTIES_LASTNAME_VALUE"],
+    },
+}
+
+_snapshot_lock = threading.Lock()
+_loaded_snapshots = {}
+
+# Edge tables and the natural key each one is upserted on
+EDGE_TABLES = {
+    "WORKED_FOR": {
+        "table": "SANDBOX_NRILEY.GRAPH_EDGES.WORKED_FOR",
+        "from_node_type": "CONTACT",
+        "to_node_type": "COMPANY",
+        "key_columns": {
+            "FROM_NODE_ID": "STRING",
+            "TO_NODE_ID": "STRING",
+            "START_DATE": "DATE",
+        },
+        "value_columns": {
+            "END_DATE": "DATE",
+            "JOB_TITLE": "STRING",
+            "DEPARTMENT": "STRING",
+            "IS_CURRENT": "BOOLEAN",
+            "CONFIDENCE_SCORE": "FLOAT",
+            "SOURCE_SYSTEM": "STRING",
+        },
+    },
+    "REPORTED_TO": {
+        "table": "SANDBOX_NRILEY.GRAPH_EDGES.REPORTED_TO",
+        "from_node_type": "CONTACT",
+        "to_node_type": "CONTACT",
+        "key_columns": {
+            "FROM_NODE_ID": "STRING",
+            "TO_NODE_ID": "STRING",
+            "START_DATE": "DATE",
+            "RELATIONSHIP_TYPE": "STRING",
+        },
+        "value_columns": {
+            "END_DATE": "DATE",
+            "IS_CURRENT": "BOOLEAN",
+            "CONFIDENCE_SCORE": "FLOAT",
+            "SOURCE_SYSTEM": "STRING",
+        },
+    },
+}
+EDGE_UPSERT_BATCH_SIZE = 500
+
+# Value columns an upsert only overwrites when the caller supplies a value
+EDGE_OPTIONAL_COLUMNS = {"JOB_TITLE", "DEPARTMENT", "CONFIDENCE_SCORE", "SOURCE_SYSTEM"}
+
+# Per-node degree and summary fields, maintained on every edge write
+NODE_SUMMARY_TABLE = "SANDBOX_NRILEY.GRAPH_EDGES.NODE_SUMMARY"
+NODE_SUMMARY_BATCH_SIZE = 1000
+
+# Clear functions of caches outside this module that hold edge reads (see register_edge_cache)
+_edge_cache_clear_hooks = []
+
+# Startup timing, recorded once per process for the startup report
+PREWARM_ENABLED = os.environ.get("PEOPLE_CARD_PREWARM", "1") != "0"
+_startup_timings = {}
+
+# Cost guardrails for ad-hoc queries, overridable via [query_guardrails] in secrets.toml
+QUERY_GUARDRAIL_DEFAULTS = {
+    "default_limit": 1000,
+    "confirm_bytes_threshold": 10 * 1024 ** 3,
+    "confirm_partitions_threshold": 10000,
+    "time_budget_seconds": 600,
+    "time_budget_window_seconds": 3600,
+}
+ANONYMOUS_QUERY_USER = "anonymous"
 
 
 @st.cache_data
 def execute_snowflake_query(query):
     """Execute a query against Snowflake and return results."""
     try:
+        started = time.perf_counter()
         conn = st.connection("snowflake", type="snowflake")
         df = conn.query(query, ttl=300)  # Cache for 5 minutes
+        record_startup_timing("first query", time.perf_counter() - started)
         return df
     except Exception as e:
         st.error(f"Failed to execute query: {str(e)}")
@@ -71,7 +176,7 @@ def get_worked_for_relationships(from_node_id=None, to_node_id=None):
     {where_sql}
     ORDER BY START_DATE DESC
     """
-    return execute_snowflake_query(query)
+    return execute_snowflake_statement(query)
 
 
 @st.cache_data
@@ -91,84 +196,865 @@ def get_reported_to_relationships(from_node_id=None, to_node_id=None):
     {where_sql}
     ORDER BY START_DATE DESC
     """
-    return execute_snowflake_query(query)
+    return execute_snowflake_statement(query)
+
+
+def _cursor_to_dataframe(cursor):
+    """Convert the results of an executed cursor into a DataFrame."""
+    import pandas as pd
+
+    try:
+        return cursor.fetch_pandas_all()
+    except Exception:
+        # Statements without an Arrow result set (EXPLAIN, DML, SHOW ...)
+        columns = [column[0] for column in cursor.description or []]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+
+def fetch_snowflake_dataframe(query, timeout=None):
+    """Execute a query against Snowflake without caching and return results.
+
+    Used by background jobs and guarded ad-hoc queries that must always see
+    fresh data. When timeout is given, Snowflake cancels the statement after
+    that many seconds.
+    """
+    started = time.perf_counter()
+    conn = st.connection("snowflake", type="snowflake")
+    cursor = conn.cursor()
+    try:
+        cursor.execute(query, timeout=timeout)
+        df = _cursor_to_dataframe(cursor)
+        record_startup_timing("first query", time.perf_counter() - started)
+        return df
+    finally:
+        cursor.close()
+
+
+def get_query_guardrails():
+    """Return the cost guardrail settings for the Custom Query page."""
+    guardrails = dict(QUERY_GUARDRAIL_DEFAULTS)
+    try:
+        guardrails.update(st.secrets.get("query_guardrails", {}))
+    except FileNotFoundError:
+        pass
+    return guardrails
+
+
+def _strip_statement(query):
+    """Trim whitespace and trailing semicolons from a single SQL statement."""
+    return query.strip().rstrip(";").strip()
+
+
+def apply_default_limit(query, limit):
+    """Add a LIMIT to a SELECT unless it already bounds its own result.
+
+    The LIMIT is added to the statement itself rather than a wrapping
+    subquery, so the statement's ORDER BY still decides which rows come back.
+    Returns the statement to run and whether a LIMIT was injected.
+    """
+    statement = _strip_statement(query)
+    # Leading comments would hide the statement keyword from the check below
+    body = re.sub(r"^(\s*(--[^\n]*(\n|$)|/\*.*?\*/))*\s*", "", statement, flags=re.DOTALL)
+    if not re.match(r"(select|with)\b", body, re.IGNORECASE):
+        return statement, False
+    if re.search(r"\blimit\s+\d+(\s+offset\s+\d+)?$|\bfetch\s+(first|next)\b", statement, re.IGNORECASE):
+        return statement, False
+    # A bare trailing OFFSET becomes LIMIT n OFFSET m
+    offset = re.search(r"\boffset\s+\d+$", statement, re.IGNORECASE)
+    if offset:
+        return f"{statement[:offset.start()]}LIMIT {int(limit)} {offset.group(0)}", True
+    # The newline keeps a trailing line comment from swallowing the LIMIT
+    return f"{statement}\nLIMIT {int(limit)}", True
+
+
+def explain_query(query):
+    """Estimate the cost of a query with EXPLAIN without executing it.
+
+    Returns a dict with partition, byte and row estimates, or None when the
+    statement cannot be explained. Snowflake does not report a row estimate,
+    so "rows" is only filled in by backends that provide one.
+    """
+    import pandas as pd
+
+    try:
+        plan = fetch_snowflake_dataframe(f"EXPLAIN USING TABULAR {_strip_statement(query)}")
+    except Exception:
+        return None
+
+    plan.columns = [str(column).lower() for column in plan.columns]
+    stats = plan[plan["operation"] == "GlobalStats"] if "operation" in plan.columns else plan.iloc[0:0]
+    if len(stats) == 0:
+        return None
+
+    def _stat(column):
+        if column not in stats.columns or pd.isna(stats.iloc[0][column]):
+            return None
+        return int(stats.iloc[0][column])
+
+    return {
+        "partitions_total": _stat("partitionstotal"),
+        "partitions_assigned": _stat("partitionsassigned"),
+        "bytes_assigned": _stat("bytesassigned"),
+        "rows": _stat("rows"),
+    }
+
+
+def requires_query_confirmation(estimate, guardrails):
+    """Return True when a query's estimated cost exceeds the configured thresholds."""
+    if estimate is None:
+        return True
+    if (estimate.get("bytes_assigned") or 0) > guardrails["confirm_bytes_threshold"]:
+        return True
+    if (estimate.get("partitions_assigned") or 0) > guardrails["confirm_partitions_threshold"]:
+        return True
+    return False
+
+
+@st.cache_resource
+def _query_time_ledger():
+    """Process-wide record of query time spent per user."""
+    return {"lock": threading.Lock(), "usage": {}}
+
+
+def get_query_user():
+    """Identify the current user for query budgeting.
+
+    Uses the signed-in user's email when authentication is configured.
+    Without authentication there is no stable per-user identity, so all
+    anonymous sessions share a single budget that a page reload cannot reset.
+    """
+    try:
+        email = st.user.get("email")
+    except Exception:
+        email = None
+    return email or ANONYMOUS_QUERY_USER
+
+
+def get_remaining_query_budget(user, guardrails):
+    """Return the seconds of query time a user has left in the current window."""
+    ledger = _query_time_ledger()
+    window_start = time.time() - guardrails["time_budget_window_seconds"]
+    with ledger["lock"]:
+        usage = [entry for entry in ledger["usage"].get(user, []) if entry[0] >= window_start]
+        ledger["usage"][user] = usage
+        spent = sum(seconds for _, seconds in usage)
+    return max(guardrails["time_budget_seconds"] - spent, 0)
+
+
+def record_query_time(user, seconds):
+    """Charge query execution time against a user's budget."""
+    ledger = _query_time_ledger()
+    with ledger["lock"]:
+        ledger["usage"].setdefault(user, []).append((time.time(), seconds))
+
+
+def execute_guarded_query(query, user, guardrails):
+    """Execute an ad-hoc query within the user's remaining query-time budget.
+
+    The statement is cancelled by Snowflake once the budget runs out, and the
+    elapsed time is charged to the user whether or not it succeeds.
+    """
+    remaining = get_remaining_query_budget(user, guardrails)
+    if remaining <= 0:
+        st.error("Query time budget exhausted. Please try again later.")
+        return None
+
+    started = time.monotonic()
+    try:
+        return fetch_snowflake_dataframe(query, timeout=math.ceil(remaining))
+    except Exception as e:
+        st.error(f"Failed to execute query: {str(e)}")
+        return None
+    finally:
+        record_query_time(user, time.monotonic() - started)
+
+
+def _snapshot_path(node_type):
+    """Return the snapshot file path for a node type."""
+    return SNAPSHOT_DIR / f"{node_type.lower()}_nodes.arrow"
+
+
+def build_node_snapshot(node_type):
+    """Export the compact attributes of a node table into an ID-sorted Arrow file.
+
+    The file is written uncompressed so it can be memory-mapped and read
+    zero-copy, and is swapped into place atomically so readers never see a
+    partially written snapshot.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    source = NODE_SNAPSHOT_SOURCES[node_type]
+    columns = source["columns"]
+    df = fetch_snowflake_dataframe(f"""
+    SELECT {", ".join(columns)}
+    FROM {source['table']}
+    WHERE ID IS NOT NULL
+    """)
+    df = df[columns].astype("string")
+    table = pa.Table.from_pandas(df, preserve_index=False).sort_by("ID")
+
+    path = _snapshot_path(node_type)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    feather.write_feather(table, tmp_path, compression="uncompressed", chunksize=max(table.num_rows, 1))
+    os.replace(tmp_path, path)
+    return path
+
+
+def refresh_node_snapshots(max_age=None):
+    """Rebuild every node snapshot that is missing or older than max_age seconds."""
+    refreshed = []
+    for node_type in NODE_SNAPSHOT_SOURCES:
+        path = _snapshot_path(node_type)
+        if max_age is not None and path.exists() and time.time() - path.stat().st_mtime < max_age:
+            continue
+        build_node_snapshot(node_type)
+        refreshed.append(node_type)
+    return refreshed
+
+
+class _SortedColumn:
+    """Sequence view over an Arrow string array so bisect can search it in place."""
+
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, index):
+        return self.array[index].as_py()
+
+
+class NodeSnapshot:
+    """Memory-mapped, ID-sorted view over a node snapshot file."""
+
+    def __init__(self, node_type, path, version):
+        import pyarrow.feather as feather
+
+        self.node_type = node_type
+        self.path = path
+        self.version = version
+        self.table = feather.read_table(path, memory_map=True)
+        ids = self.table.column("ID")
+        self._ids = _SortedColumn(ids.chunk(0) if ids.num_chunks == 1 else ids.combine_chunks())
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def lookup(self, node_id):
+        """Return the snapshot row for a node ID as a dict, or None if absent."""
+        key = str(node_id)
+        index = bisect.bisect_left(self._ids, key)
+        if index < len(self._ids) and self._ids[index] == key:
+            return self.table.slice(index, 1).to_pylist()[0]
+        return None
+
+    def label(self, node_id):
+        """Return a human readable label for a node ID."""
+        row = self.lookup(node_id)
+        if row is None:
+            return str(node_id)
+        if self.node_type == "COMPANY":
+            return row.get("NAME") or row.get("DOMAIN") or str(node_id)
+        name = f"{row.get('PROPERTIES_FIRSTNAME_VALUE') or ''} {row.get('PROPERTIES_LASTNAME_VALUE') or ''}".strip()
+        return name or row.get("EMAIL") or str(node_id)
+
+    def search(self, column, text, limit=20):
+        """Case-insensitive substring search over one column."""
+        import pyarrow.compute as pc
+
+        mask = pc.match_substring(self.table.column(column), text, ignore_case=True)
+        return self.table.filter(mask).slice(0, limit).to_pandas()
+
+
+def get_node_snapshot(node_type):
+    """Return the current snapshot for a node type, or None if none has been built.
+
+    The mapped file is reopened whenever it has been replaced on disk, so a
+    refresh by any process is picked up on the next lookup.
+    """
+    path = _snapshot_path(node_type)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    version = (stat.st_ino, stat.st_mtime_ns)
+
+    with _snapshot_lock:
+        snapshot = _loaded_snapshots.get(node_type)
+        if snapshot is None or snapshot.version != version:
+            snapshot = NodeSnapshot(node_type, path, version)
+            _loaded_snapshots[node_type] = snapshot
+        return snapshot
+
+
+def get_node_label(node_type, node_id):
+    """Resolve a node ID to a display label, falling back to the raw ID."""
+    snapshot = get_node_snapshot(node_type)
+    if snapshot is None:
+        return str(node_id)
+    return snapshot.label(node_id)
+
+
+def _snapshot_refresh_loop():
+    """Keep node snapshots fresh for the lifetime of the process."""
+    while True:
+        try:
+            refresh_node_snapshots(max_age=SNAPSHOT_REFRESH_SECONDS)
+        except Exception:
+            logger.exception("Node snapshot refresh failed")
+        time.sleep(min(SNAPSHOT_REFRESH_SECONDS, 60))
+
+
+@st.cache_resource
+def start_snapshot_refresher():
+    """Start the background snapshot refresh thread once per process."""
+    thread = threading.Thread(target=_snapshot_refresh_loop, name="node-snapshot-refresher", daemon=True)
+    thread.start()
+    return thread
+
+
+def record_startup_timing(name, seconds):
+    """Record how long a startup step took, keeping the first measurement."""
+    _startup_timings.setdefault(name, seconds)
+
+
+def prewarm_data_layer():
+    """Load heavy dependencies, the Snowflake connection and node snapshots ahead of first use."""
+    for module_name in ("pandas", "pyarrow", "pyarrow.compute", "pyarrow.feather"):
+        started = time.perf_counter()
+        importlib.import_module(module_name)
+        record_startup_timing(f"import {module_name}", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        st.connection("snowflake", type="snowflake")
+        record_startup_timing("snowflake connection", time.perf_counter() - started)
+    except Exception:
+        logger.warning("Prewarm could not open the Snowflake connection", exc_info=True)
+
+    for node_type in NODE_SNAPSHOT_SOURCES:
+        started = time.perf_counter()
+        if get_node_snapshot(node_type) is not None:
+            record_startup_timing(f"map {node_type.lower()} snapshot", time.perf_counter() - started)
+
+
+@st.cache_resource
+def start_prewarm():
+    """Pre-warm the data layer in a background thread once per process.
+
+    Runs in the background, so the first page renders without waiting and
+    the first data access finds everything already loaded. Disable with
+    PEOPLE_CARD_PREWARM=0.
+    """
+    if not PREWARM_ENABLED:
+        return None
+    thread = threading.Thread(target=prewarm_data_layer, name="data-layer-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def start_background_jobs():
+    """Start the data-layer pre-warm and the snapshot refresher once per process.
+
+    Called from the entry point and from every data page, so a deep link to
+    any page warms up the data layer as well.
+    """
+    start_prewarm()
+    start_snapshot_refresher()
+
+
+def get_startup_report():
+    """Return recorded startup timings as (step, milliseconds) pairs, slowest first."""
+    return sorted(
+        ((name, seconds * 1000) for name, seconds in _startup_timings.items()),
+        key=lambda row: row[1],
+        reverse=True
+    )
+
+
+def show_startup_report():
+    """Display the startup timing report in the sidebar."""
+    with st.sidebar.expander("⏱️ Startup Timing"):
+        report = get_startup_report()
+        if not report:
+            st.caption("No timings recorded yet")
+        for name, milliseconds in report:
+            st.write(f"**{name}:** {milliseconds:,.0f} ms")
+
+
+def profile_imports(module_name="utils", top=15):
+    """Measure import cost in a fresh interpreter with python -X importtime.
+
+    Returns the module's total import time in milliseconds and the slowest
+    imports as (module, cumulative ms, self ms), slowest first. Raises
+    RuntimeError with the interpreter's error output if the import fails.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent
+    )
+    if result.returncode != 0:
+        errors = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"import {module_name} failed with exit code {result.returncode}:\n{errors}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        rows.append((name, int(cumulative_us) / 1000, int(self_us) / 1000))
+
+    total = next((cumulative for name, cumulative, _ in rows if name == module_name), 0.0)
+    return total, sorted(rows, key=lambda row: row[1], reverse=True)[:top]
 
 
-@st.cache_data
 def search_companies_by_domain(domain_search):
-    """Search companies by domain."""
+    """Search companies by domain, served from the node snapshot when available."""
+    snapshot = get_node_snapshot("COMPANY")
+    if snapshot is not None:
+        return attach_node_summaries(snapshot.search("DOMAIN", domain_search), "COMPANY")
+    return _with_string_ids(_query_companies_by_domain(domain_search))
+
+
+def search_contacts_by_email(email_search):
+    """Search contacts by email, served from the node snapshot when available."""
+    snapshot = get_node_snapshot("CONTACT")
+    if snapshot is not None:
+        return attach_node_summaries(snapshot.search("EMAIL", email_search), "CONTACT")
+    return _with_string_ids(_query_contacts_by_email(email_search))
+
+
+def _node_id_to_str(value):
+    """Render a node ID as a string, treating NULLs as None.
+
+    NUMBER IDs come back as floats when the column contains NULLs, so
+    integral floats are rendered without a trailing ".0".
+    """
+    import pandas as pd
+
+    if value is None or pd.isna(value):
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+
+def _with_string_ids(df):
+    """Return node IDs as strings, matching what the snapshot path returns."""
+    if df is None:
+        return df
+    df = df.copy()
+    for column in ["ID", "LATEST_EMPLOYER_ID"]:
+        if column in df.columns:
+            df[column] = df[column].map(_node_id_to_str)
+    return df
+
+
+@st.cache_data
+def _query_companies_by_domain(domain_search):
+    """Search companies by domain in Snowflake, joined with their node summaries."""
     query = f"""
-    SELECT ID, DOMAIN, NAME
-    FROM PROD_HUBSPOT.HUBSPOT_CRM.COMPANIES
-    WHERE DOMAIN ILIKE '%{domain_search}%'
+    SELECT
+        c.ID, c.DOMAIN, c.NAME,
+        COALESCE(s.CURRENT_EMPLOYEE_COUNT, 0) AS CURRENT_EMPLOYEE_COUNT,
+        COALESCE(s.FORMER_EMPLOYEE_COUNT, 0) AS FORMER_EMPLOYEE_COUNT,
+        s.UPDATED_AT
+    FROM PROD_HUBSPOT.HUBSPOT_CRM.COMPANIES c
+    LEFT JOIN {NODE_SUMMARY_TABLE} s ON s.NODE_TYPE = 'COMPANY' AND s.NODE_ID = c.ID
+    WHERE c.DOMAIN ILIKE '%{domain_search}%'
     LIMIT 20
     """
-    return execute_snowflake_query(query)
+    return execute_snowflake_statement(query)
 
 
 @st.cache_data
-def search_contacts_by_email(email_search):
-    """Search contacts by email."""
+def _query_contacts_by_email(email_search):
+    """Search contacts by email in Snowflake, joined with their node summaries."""
     query = f"""
-    SELECT ID, EMAIL, PROPERTIES_FIRSTNAME_VALUE, PROPERTIES_LASTNAME_VALUE
-    FROM PROD_HUBSPOT.HUBSPOT_CRM.CONTACTS
-    WHERE EMAIL ILIKE '%{email_search}%'
+    SELECT
+        c.ID, c.EMAIL, c.PROPERTIES_FIRSTNAME_VALUE, c.PROPERTIES_LASTNAME_VALUE,
+        COALESCE(s.DIRECT_REPORT_COUNT, 0) AS DIRECT_REPORT_COUNT,
+        s.LATEST_EMPLOYER_ID,
+        e.NAME AS LATEST_EMPLOYER_NAME,
+        s.UPDATED_AT
+    FROM PROD_HUBSPOT.HUBSPOT_CRM.CONTACTS c
+    LEFT JOIN {NODE_SUMMARY_TABLE} s ON s.NODE_TYPE = 'CONTACT' AND s.NODE_ID = c.ID
+    LEFT JOIN PROD_HUBSPOT.HUBSPOT_CRM.COMPANIES e ON e.ID = s.LATEST_EMPLOYER_ID
+    WHERE c.EMAIL ILIKE '%{email_search}%'
     LIMIT 20
     """
-    return execute_snowflake_query(query)
+    return execute_snowflake_statement(query)
 
 
-def insert_worked_for_relationship(from_node_id, to_node_id, start_date, end_date=None, job_title=None, department=None):
-    """Insert a new WORKED_FOR relationship."""
-    # Construct values for optional fields
-    end_date_val = f"'{end_date}'" if end_date else "NULL"
-    job_title_val = f"'{job_title}'" if job_title else "NULL"
-    department_val = f"'{department}'" if department else "NULL"
-    is_current = "TRUE" if end_date is None else "FALSE"
-    
-    query = f"""
-    INSERT INTO SANDBOX_NRILEY.GRAPH_EDGES.WORKED_FOR (
-        FROM_NODE_ID, TO_NODE_ID, START_DATE, END_DATE, JOB_TITLE, DEPARTMENT, IS_CURRENT, SOURCE_SYSTEM
-    ) VALUES (
-        '{from_node_id}', '{to_node_id}', '{start_date}', {end_date_val}, {job_title_val}, {department_val}, {is_current}, 'MANUAL'
+def _sql_literal(value):
+    """Render a Python value as a SQL literal."""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, np.datetime64):
+        value = pd.Timestamp(value)
+    elif isinstance(value, np.generic):
+        # numpy scalars repr as e.g. "np.int64(101)", so unwrap them first
+        value = value.item()
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, numbers.Number):
+        return repr(value)
+    if isinstance(value, datetime.date):
+        return f"'{value.isoformat()[:10]}'"
+    escaped = str(value).replace("\\", "\\\\").replace("'", "''")
+    return f"'{escaped}'"
+
+
+def _as_date(value):
+    """Normalize a date-like value from a form or DataFrame to a date or None."""
+    import pandas as pd
+
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    timestamp = pd.Timestamp(value)
+    return None if pd.isna(timestamp) else timestamp.date()
+
+
+def register_edge_cache(clear):
+    """Have edge writes also call clear, for modules that cache their own edge reads."""
+    if clear not in _edge_cache_clear_hooks:
+        _edge_cache_clear_hooks.append(clear)
+
+
+def _clear_edge_caches():
+    """Drop cached edge and summary reads so writes show up on the next rerun."""
+    get_worked_for_relationships.clear()
+    get_reported_to_relationships.clear()
+    get_node_summaries.clear()
+    _query_companies_by_domain.clear()
+    _query_contacts_by_email.clear()
+    for clear in _edge_cache_clear_hooks:
+        clear()
+
+
+def execute_snowflake_statement(query):
+    """Execute a statement against Snowflake without caching.
+
+    Used for writes and for reads that must reflect them, such as edge lists
+    and node summaries; their callers cache results themselves and clear them
+    on write via _clear_edge_caches.
+    """
+    try:
+        return fetch_snowflake_dataframe(query)
+    except Exception as e:
+        st.error(f"Failed to execute statement: {str(e)}")
+        return None
+
+
+def _normalize_edge_row(edge_type, row):
+    """Fill defaults and derived fields for an edge row before it is written."""
+    row = dict(row)
+    row["START_DATE"] = _as_date(row.get("START_DATE"))
+    row["END_DATE"] = _as_date(row.get("END_DATE"))
+    row["IS_CURRENT"] = row["END_DATE"] is None
+    row["FROM_NODE_ID"] = _node_id_to_str(row.get("FROM_NODE_ID"))
+    row["TO_NODE_ID"] = _node_id_to_str(row.get("TO_NODE_ID"))
+    config = EDGE_TABLES[edge_type]
+    return {column: row.get(column) for column in [*config["key_columns"], *config["value_columns"]]}
+
+
+def _build_edge_merge(edge_type, rows):
+    """Build a MERGE statement upserting rows on the edge's natural key."""
+    config = EDGE_TABLES[edge_type]
+    column_types = {**config["key_columns"], **config["value_columns"]}
+    columns = list(column_types)
+
+    source_columns = ",\n        ".join(
+        f"column{i}::{column_types[column]} AS {column}" for i, column in enumerate(columns, start=1)
+    )
+    values = ",\n        ".join(
+        "(" + ", ".join(_sql_literal(row[column]) for column in columns) + ")" for row in rows
     )
+    on_clause = " AND ".join(f"EQUAL_NULL(t.{column}, s.{column})" for column in config["key_columns"])
+    # Optional columns left empty keep their stored value instead of being nulled
+    new_values = {
+        column: f"COALESCE(s.{column}, t.{column})" if column in EDGE_OPTIONAL_COLUMNS else f"s.{column}"
+        for column in config["value_columns"]
+    }
+    changed = " AND ".join(f"EQUAL_NULL(t.{column}, {value})" for column, value in new_values.items())
+    update_set = ", ".join(f"{column} = {value}" for column, value in new_values.items())
+    insert_values = ", ".join(
+        "COALESCE(s.SOURCE_SYSTEM, 'MANUAL')" if column == "SOURCE_SYSTEM" else f"s.{column}" for column in columns
+    )
+
+    return f"""
+    MERGE INTO {config['table']} t
+    USING (
+        SELECT
+        {source_columns}
+        FROM VALUES
+        {values}
+    ) s
+    ON {on_clause}
+    WHEN MATCHED AND NOT ({changed}) THEN
+        UPDATE SET {update_set}, UPDATED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN
+        INSERT ({", ".join(columns)})
+        VALUES ({insert_values})
     """
-    return execute_snowflake_query(query)
 
 
-def insert_reported_to_relationship(from_node_id, to_node_id, start_date, end_date=None, relationship_type=None):
-    """Insert a new REPORTED_TO relationship."""
-    # Construct values for optional fields
-    end_date_val = f"'{end_date}'" if end_date else "NULL"
-    relationship_type_val = f"'{relationship_type}'" if relationship_type else "NULL"
-    is_current = "TRUE" if end_date is None else "FALSE"
-    
+def upsert_edges(edge_type, rows, batch_size=EDGE_UPSERT_BATCH_SIZE):
+    """Insert or update edges keyed on their natural key using batched MERGEs.
+
+    Rows are dicts keyed by column name. Re-sending unchanged edges is a
+    no-op, including for NODE_SUMMARY, a changed edge is updated in place (keeping its EDGE_ID and
+    bumping UPDATED_AT), and a new edge is inserted. Optional columns
+    (EDGE_OPTIONAL_COLUMNS) left empty keep their stored values, and new
+    edges default to SOURCE_SYSTEM 'MANUAL'. Returns the number of
+    rows inserted and updated.
+    """
+    config = EDGE_TABLES[edge_type]
+    # MERGE rejects duplicate source keys, so keep the last row per key
+    deduplicated = {}
+    for row in rows:
+        row = _normalize_edge_row(edge_type, row)
+        deduplicated[tuple(row[column] for column in config["key_columns"])] = row
+    rows = list(deduplicated.values())
+
+    counts = {"inserted": 0, "updated": 0}
+    changed_rows = []
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        result = execute_snowflake_statement(_build_edge_merge(edge_type, batch))
+        if result is None:
+            break
+        if len(result) > 0:
+            inserted = int(result.iloc[0].get("number of rows inserted", 0))
+            updated = int(result.iloc[0].get("number of rows updated", 0))
+            counts["inserted"] += inserted
+            counts["updated"] += updated
+            # Batches the MERGE left untouched need no summary refresh
+            if inserted + updated > 0:
+                changed_rows.extend(batch)
+
+    if changed_rows:
+        refresh_node_summaries_for_edges(edge_type, changed_rows)
+        _clear_edge_caches()
+    return counts
+
+
+def update_edge(edge_type, edge_id, values):
+    """Update an existing edge in place, keeping its EDGE_ID."""
+    config = EDGE_TABLES[edge_type]
+    values = dict(values)
+    if "START_DATE" in values:
+        values["START_DATE"] = _as_date(values["START_DATE"])
+    if "END_DATE" in values:
+        values["END_DATE"] = _as_date(values["END_DATE"])
+        values["IS_CURRENT"] = values["END_DATE"] is None
+    set_sql = ", ".join(f"{column} = {_sql_literal(value)}" for column, value in values.items())
+
     query = f"""
-    INSERT INTO SANDBOX_NRILEY.GRAPH_EDGES.REPORTED_TO (
-        FROM_NODE_ID, TO_NODE_ID, START_DATE, END_DATE, RELATIONSHIP_TYPE, IS_CURRENT, SOURCE_SYSTEM
-    ) VALUES (
-        '{from_node_id}', '{to_node_id}', '{start_date}', {end_date_val}, {relationship_type_val}, {is_current}, 'MANUAL'
-    )
+    UPDATE {config['table']}
+    SET {set_sql}, UPDATED_AT = CURRENT_TIMESTAMP()
+    WHERE EDGE_ID = {_sql_literal(edge_id)}
     """
-    return execute_snowflake_query(query)
+    result = execute_snowflake_statement(query)
+    refresh_node_summaries_for_edges(edge_type, get_edge_endpoints(edge_type, edge_id))
+    _clear_edge_caches()
+    return result
+
+
+def get_edge_endpoints(edge_type, edge_id):
+    """Return the FROM/TO node IDs of an edge as a list of row dicts."""
+    query = f"""
+    SELECT FROM_NODE_ID, TO_NODE_ID
+    FROM {EDGE_TABLES[edge_type]['table']}
+    WHERE EDGE_ID = {_sql_literal(edge_id)}
+    """
+    df = execute_snowflake_statement(query)
+    return df.to_dict("records") if df is not None else []
+
+
+def _id_values_sql(ids):
+    """Render node IDs as a single-column VALUES list."""
+    return ", ".join(f"({_sql_literal(str(node_id))})" for node_id in ids)
+
+
+def _build_node_summary_merge(contact_ids, company_ids):
+    """Build a MERGE recomputing NODE_SUMMARY rows for the given nodes only.
+
+    Rows whose summary fields are unchanged keep their UPDATED_AT.
+    """
+    sources = []
+    if company_ids:
+        ids_sql = _id_values_sql(company_ids)
+        sources.append(f"""
+        SELECT
+            'COMPANY' AS NODE_TYPE,
+            c.ID AS NODE_ID,
+            COUNT(DISTINCT IFF(w.IS_CURRENT, w.FROM_NODE_ID, NULL)) AS CURRENT_EMPLOYEE_COUNT,
+            COUNT(DISTINCT w.FROM_NODE_ID) - COUNT(DISTINCT IFF(w.IS_CURRENT, w.FROM_NODE_ID, NULL)) AS FORMER_EMPLOYEE_COUNT,
+            0 AS DIRECT_REPORT_COUNT,
+            NULL::STRING AS LATEST_EMPLOYER_ID
+        FROM (SELECT column1::STRING AS ID FROM VALUES {ids_sql}) c
+        LEFT JOIN {EDGE_TABLES['WORKED_FOR']['table']} w ON w.TO_NODE_ID = c.ID
+        GROUP BY c.ID""")
+    if contact_ids:
+        ids_sql = _id_values_sql(contact_ids)
+        sources.append(f"""
+        SELECT
+            'CONTACT' AS NODE_TYPE,
+            c.ID AS NODE_ID,
+            0 AS CURRENT_EMPLOYEE_COUNT,
+            0 AS FORMER_EMPLOYEE_COUNT,
+            COALESCE(r.DIRECT_REPORT_COUNT, 0) AS DIRECT_REPORT_COUNT,
+            l.TO_NODE_ID AS LATEST_EMPLOYER_ID
+        FROM (SELECT column1::STRING AS ID FROM VALUES {ids_sql}) c
+        LEFT JOIN (
+            SELECT TO_NODE_ID, COUNT(DISTINCT FROM_NODE_ID) AS DIRECT_REPORT_COUNT
+            FROM {EDGE_TABLES['REPORTED_TO']['table']}
+            WHERE IS_CURRENT AND COALESCE(RELATIONSHIP_TYPE, 'DIRECT_REPORT') = 'DIRECT_REPORT'
+            GROUP BY TO_NODE_ID
+        ) r ON r.TO_NODE_ID = c.ID
+        LEFT JOIN (
+            SELECT FROM_NODE_ID, TO_NODE_ID
+            FROM {EDGE_TABLES['WORKED_FOR']['table']}
+            QUALIFY ROW_NUMBER() OVER (
+                PARTITION BY FROM_NODE_ID ORDER BY IS_CURRENT DESC NULLS LAST, START_DATE DESC NULLS LAST
+            ) = 1
+        ) l ON l.FROM_NODE_ID = c.ID""")
+
+    summary_columns = ["CURRENT_EMPLOYEE_COUNT", "FORMER_EMPLOYEE_COUNT", "DIRECT_REPORT_COUNT", "LATEST_EMPLOYER_ID"]
+    return f"""
+    MERGE INTO {NODE_SUMMARY_TABLE} t
+    USING ({" UNION ALL ".join(sources)}
+    ) s
+    ON t.NODE_TYPE = s.NODE_TYPE AND t.NODE_ID = s.NODE_ID
+    WHEN MATCHED AND NOT ({" AND ".join(f"EQUAL_NULL(t.{column}, s.{column})" for column in summary_columns)}) THEN
+        UPDATE SET {", ".join(f"{column} = s.{column}" for column in summary_columns)}, UPDATED_AT = CURRENT_TIMESTAMP()
+    WHEN NOT MATCHED THEN
+        INSERT (NODE_TYPE, NODE_ID, {", ".join(summary_columns)})
+        VALUES (s.NODE_TYPE, s.NODE_ID, {", ".join(f"s.{column}" for column in summary_columns)})
+    """
+
+
+def refresh_node_summaries(contact_ids=(), company_ids=()):
+    """Recompute NODE_SUMMARY rows for the nodes touched by an edge write."""
+    contact_ids = sorted({str(node_id) for node_id in contact_ids if node_id is not None})
+    company_ids = sorted({str(node_id) for node_id in company_ids if node_id is not None})
+    for start in range(0, max(len(contact_ids), len(company_ids)), NODE_SUMMARY_BATCH_SIZE):
+        end = start + NODE_SUMMARY_BATCH_SIZE
+        execute_snowflake_statement(_build_node_summary_merge(contact_ids[start:end], company_ids[start:end]))
+
+
+def refresh_node_summaries_for_edges(edge_type, rows):
+    """Refresh NODE_SUMMARY for both endpoints of the given edge rows."""
+    config = EDGE_TABLES[edge_type]
+    node_ids = {"CONTACT": set(), "COMPANY": set()}
+    for row in rows:
+        node_ids[config["from_node_type"]].add(row.get("FROM_NODE_ID"))
+        node_ids[config["to_node_type"]].add(row.get("TO_NODE_ID"))
+    refresh_node_summaries(contact_ids=node_ids["CONTACT"], company_ids=node_ids["COMPANY"])
+
+
+@st.cache_data
+def get_node_summaries(node_type, node_ids):
+    """Get NODE_SUMMARY rows for a tuple of node IDs in a single query."""
+    if not node_ids:
+        return None
+    query = f"""
+    SELECT NODE_ID, CURRENT_EMPLOYEE_COUNT, FORMER_EMPLOYEE_COUNT, DIRECT_REPORT_COUNT, LATEST_EMPLOYER_ID, UPDATED_AT
+    FROM {NODE_SUMMARY_TABLE}
+    WHERE NODE_TYPE = {_sql_literal(node_type)}
+    AND NODE_ID IN ({", ".join(_sql_literal(str(node_id)) for node_id in node_ids)})
+    """
+    return execute_snowflake_statement(query)
+
+
+def attach_node_summaries(df, node_type):
+    """Join NODE_SUMMARY counts onto search results keyed by ID."""
+    import pandas as pd
+
+    if df is None or len(df) == 0:
+        return df
+    summaries = get_node_summaries(node_type, tuple(df["ID"].astype(str)))
+    if summaries is None:
+        summaries = pd.DataFrame(columns=["NODE_ID", "CURRENT_EMPLOYEE_COUNT", "FORMER_EMPLOYEE_COUNT",
+                                          "DIRECT_REPORT_COUNT", "LATEST_EMPLOYER_ID", "UPDATED_AT"])
+    df = df.assign(NODE_ID=df["ID"].astype(str)).merge(summaries, on="NODE_ID", how="left").drop(columns="NODE_ID")
+    for column in ["CURRENT_EMPLOYEE_COUNT", "FORMER_EMPLOYEE_COUNT", "DIRECT_REPORT_COUNT"]:
+        df[column] = df[column].fillna(0).astype(int)
+    if node_type == "CONTACT":
+        df["LATEST_EMPLOYER_NAME"] = [
+            get_node_label("COMPANY", employer_id) if pd.notna(employer_id) else None
+            for employer_id in df["LATEST_EMPLOYER_ID"]
+        ]
+    return df
+
+
+def format_summary_updated_at(value):
+    """Render a NODE_SUMMARY UPDATED_AT for a result card, or "" when there is none."""
+    import pandas as pd
+
+    if value is None or pd.isna(value):
+        return ""
+    return f" · updated {pd.Timestamp(value):%Y-%m-%d %H:%M}"
+
+
+def insert_worked_for_relationship(from_node_id, to_node_id, start_date, end_date=None, job_title=None, department=None):
+    """Insert a new WORKED_FOR relationship, or update it if it already exists."""
+    return upsert_edges("WORKED_FOR", [{
+        "FROM_NODE_ID": from_node_id,
+        "TO_NODE_ID": to_node_id,
+        "START_DATE": start_date,
+        "END_DATE": end_date,
+        "JOB_TITLE": job_title,
+        "DEPARTMENT": department,
+    }])
+
+
+def insert_reported_to_relationship(from_node_id, to_node_id, start_date, end_date=None, relationship_type=None):
+    """Insert a new REPORTED_TO relationship, or update it if it already exists."""
+    return upsert_edges("REPORTED_TO", [{
+        "FROM_NODE_ID": from_node_id,
+        "TO_NODE_ID": to_node_id,
+        "START_DATE": start_date,
+        "END_DATE": end_date,
+        "RELATIONSHIP_TYPE": relationship_type,
+    }])
 
 
 def delete_worked_for_relationship(edge_id):
     """Delete a WORKED_FOR relationship."""
+    endpoints = get_edge_endpoints("WORKED_FOR", edge_id)
     query = f"""
     DELETE FROM SANDBOX_NRILEY.GRAPH_EDGES.WORKED_FOR
-    WHERE EDGE_ID = '{edge_id}'
+    WHERE EDGE_ID = {_sql_literal(edge_id)}
     """
-    return execute_snowflake_query(query)
+    result = execute_snowflake_statement(query)
+    refresh_node_summaries_for_edges("WORKED_FOR", endpoints)
+    _clear_edge_caches()
+    return result
 
 
 def delete_reported_to_relationship(edge_id):
     """Delete a REPORTED_TO relationship."""
+    endpoints = get_edge_endpoints("REPORTED_TO", edge_id)
     query = f"""
     DELETE FROM SANDBOX_NRILEY.GRAPH_EDGES.REPORTED_TO
-    WHERE EDGE_ID = '{edge_id}'
+    WHERE EDGE_ID = {_sql_literal(edge_id)}
     """
-    return execute_snowflake_query(query)
+    result = execute_snowflake_statement(query)
+    refresh_node_summaries_for_edges("REPORTED_TO", endpoints)
+    _clear_edge_caches()
+    return result
 
 
 def display_table_info(df, table_name):
@@ -348,6 +1234,89 @@ def show_employee_form(company_id, form_key="employee_form"):
             st.error("Please select a contact")
 
 
+def toggle_edge_edit(edge_id):
+    """Open the in-place edit form for an edge, or close it if already open."""
+    if st.session_state.get('editing_edge_id') == edge_id:
+        st.session_state.editing_edge_id = None
+    else:
+        st.session_state.editing_edge_id = edge_id
+
+
+def show_edit_worked_for_form(rel, form_key="edit_worked_for_form"):
+    """Show form to edit an existing WORKED_FOR relationship in place."""
+    with st.form(form_key):
+        st.write("**Edit Employment Relationship:**")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("Start Date", value=_as_date(rel.get('START_DATE')))
+        with col2:
+            end_date = st.date_input("End Date (leave empty if current)", value=_as_date(rel.get('END_DATE')))
+        
+        job_title = st.text_input("Job Title (optional)", value=rel.get('JOB_TITLE') or "")
+        department = st.text_input("Department (optional)", value=rel.get('DEPARTMENT') or "")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            submitted = st.form_submit_button("Save Changes", type="primary")
+        with col2:
+            cancelled = st.form_submit_button("Cancel")
+        
+        if submitted:
+            update_edge("WORKED_FOR", rel.get('EDGE_ID'), {
+                "START_DATE": start_date,
+                "END_DATE": end_date,
+                "JOB_TITLE": job_title if job_title else None,
+                "DEPARTMENT": department if department else None,
+            })
+            st.session_state.editing_edge_id = None
+            st.success("Employment relationship updated!")
+            st.rerun()
+        elif cancelled:
+            st.session_state.editing_edge_id = None
+            st.rerun()
+
+
+def show_edit_reported_to_form(rel, form_key="edit_reported_to_form"):
+    """Show form to edit an existing REPORTED_TO relationship in place."""
+    with st.form(form_key):
+        st.write("**Edit Reporting Relationship:**")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("Start Date", value=_as_date(rel.get('START_DATE')))
+        with col2:
+            end_date = st.date_input("End Date (leave empty if current)", value=_as_date(rel.get('END_DATE')))
+        
+        reporting_types = ["DIRECT_REPORT", "DOTTED_LINE", "MATRIX"]
+        current_type = rel.get('RELATIONSHIP_TYPE')
+        reporting_type = st.selectbox(
+            "Reporting Type",
+            options=reporting_types,
+            index=reporting_types.index(current_type) if current_type in reporting_types else 0,
+            help="Type of reporting relationship"
+        )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            submitted = st.form_submit_button("Save Changes", type="primary")
+        with col2:
+            cancelled = st.form_submit_button("Cancel")
+        
+        if submitted:
+            update_edge("REPORTED_TO", rel.get('EDGE_ID'), {
+                "START_DATE": start_date,
+                "END_DATE": end_date,
+                "RELATIONSHIP_TYPE": reporting_type,
+            })
+            st.session_state.editing_edge_id = None
+            st.success("Reporting relationship updated!")
+            st.rerun()
+        elif cancelled:
+            st.session_state.editing_edge_id = None
+            st.rerun()
+
+
 def show_relationship_management_for_contact(contact_id):
     """Show relationship management UI for a contact (FROM node)."""
     st.subheader("🔗 Relationships")
@@ -366,15 +1335,18 @@ def show_relationship_management_for_contact(contact_id):
                 current_text = " (Current)" if rel.get('IS_CURRENT') else ""
                 date_range = f"{rel.get('START_DATE', 'Unknown')} - {rel.get('END_DATE', 'Present')}"
                 job_info = f" as {rel.get('JOB_TITLE', 'Unknown Role')}" if rel.get('JOB_TITLE') else ""
-                st.write(f"**Company ID:** {rel.get('TO_NODE_ID')} | {date_range}{job_info}{current_text}")
+                st.write(f"**Company:** {get_node_label('COMPANY', rel.get('TO_NODE_ID'))} | {date_range}{job_info}{current_text}")
             with col2:
                 if st.button("Edit", key=f"edit_worked_{rel.get('EDGE_ID')}"):
-                    st.info("Edit functionality - coming soon")
+                    toggle_edge_edit(rel.get('EDGE_ID'))
+                    st.rerun()
             with col3:
                 if st.button("Delete", key=f"delete_worked_{rel.get('EDGE_ID')}", type="secondary"):
                     delete_worked_for_relationship(rel.get('EDGE_ID'))
                     st.success("Relationship deleted!")
                     st.rerun()
+            if st.session_state.get('editing_edge_id') == rel.get('EDGE_ID'):
+                show_edit_worked_for_form(rel, f"edit_form_{rel.get('EDGE_ID')}")
     else:
         st.info("No employment relationships found")
     
@@ -387,15 +1359,18 @@ def show_relationship_management_for_contact(contact_id):
                 current_text = " (Current)" if rel.get('IS_CURRENT') else ""
                 date_range = f"{rel.get('START_DATE', 'Unknown')} - {rel.get('END_DATE', 'Present')}"
                 rel_type = f" ({rel.get('RELATIONSHIP_TYPE', 'Unknown Type')})" if rel.get('RELATIONSHIP_TYPE') else ""
-                st.write(f"**Manager ID:** {rel.get('TO_NODE_ID')} | {date_range}{rel_type}{current_text}")
+                st.write(f"**Manager:** {get_node_label('CONTACT', rel.get('TO_NODE_ID'))} | {date_range}{rel_type}{current_text}")
             with col2:
                 if st.button("Edit", key=f"edit_report_{rel.get('EDGE_ID')}"):
-                    st.info("Edit functionality - coming soon")
+                    toggle_edge_edit(rel.get('EDGE_ID'))
+                    st.rerun()
             with col3:
                 if st.button("Delete", key=f"delete_report_{rel.get('EDGE_ID')}", type="secondary"):
                     delete_reported_to_relationship(rel.get('EDGE_ID'))
                     st.success("Relationship deleted!")
                     st.rerun()
+            if st.session_state.get('editing_edge_id') == rel.get('EDGE_ID'):
+                show_edit_reported_to_form(rel, f"edit_form_{rel.get('EDGE_ID')}")
     else:
         st.info("No reporting relationships found")
     
@@ -448,15 +1423,18 @@ def show_relationship_management_for_company(company_id):
                 current_text = " (Current)" if rel.get('IS_CURRENT') else ""
                 date_range = f"{rel.get('START_DATE', 'Unknown')} - {rel.get('END_DATE', 'Present')}"
                 job_info = f" as {rel.get('JOB_TITLE', 'Unknown Role')}" if rel.get('JOB_TITLE') else ""
-                st.write(f"**Contact ID:** {rel.get('FROM_NODE_ID')} | {date_range}{job_info}{current_text}")
+                st.write(f"**Contact:** {get_node_label('CONTACT', rel.get('FROM_NODE_ID'))} | {date_range}{job_info}{current_text}")
             with col2:
                 if st.button("Edit", key=f"edit_{rel.get('EDGE_ID')}"):
-                    st.info("Edit functionality - coming soon")
+                    toggle_edge_edit(rel.get('EDGE_ID'))
+                    st.rerun()
             with col3:
                 if st.button("Delete", key=f"delete_{rel.get('EDGE_ID')}", type="secondary"):
                     delete_worked_for_relationship(rel.get('EDGE_ID'))
                     st.success("Relationship deleted!")
                     st.rerun()
+            if st.session_state.get('editing_edge_id') == rel.get('EDGE_ID'):
+                show_edit_worked_for_form(rel, f"edit_form_{rel.get('EDGE_ID')}")
     else:
         st.info("No employee relationships found")
     
@@ -474,4 +1452,32 @@ def show_relationship_management_for_company(company_id):
     
     # Show form based on button click
     if st.session_state.show_employee_form:
-        show_employee_form(company_id, f"employee_form_{company_id}")
\ No newline at end of file
+        show_employee_form(company_id, f"employee_form_{company_id}")
+
+
+record_startup_timing("import utils", time.perf_counter() - _IMPORT_STARTED)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="People Card maintenance tasks")
+    parser.add_argument("--profile-imports", action="store_true", help="report the slowest imports of utils")
+    parser.add_argument("--max-import-ms", type=float, help="fail if importing utils takes longer than this")
+    args = parser.parse_args()
+
+    if args.profile_imports or args.max_import_ms:
+        # Startup timing report: python utils.py --profile-imports
+        try:
+            total, slowest = profile_imports()
+        except RuntimeError as e:
+            sys.exit(str(e))
+        print(f"import utils: {total:,.0f} ms")
+        for name, cumulative, self_time in slowest:
+            print(f"  {cumulative:>10,.1f} ms  {self_time:>8,.1f} ms self  {name}")
+        if args.max_import_ms and total > args.max_import_ms:
+            sys.exit(f"import utils took {total:,.0f} ms, over the {args.max_import_ms:,.0f} ms budget")
+    else:
+        # Build node snapshots ahead of time: python utils.py
+        for built in refresh_node_snapshots():
+            print(f"Built {built} snapshot at {_snapshot_path(built)}")